@@ -1,6 +1,6 @@
 __version__ = "0.4.0"
 
 from .containers import AppDataContainer  # noqa: F401
-from .fields import AppDataField, ListModelMultipleChoiceField  # noqa: F401
+from .fields import AppDataField, AppDataJSONField, CompressedAppDataField, ListModelMultipleChoiceField  # noqa: F401
 from .forms import AppDataForm, MultiForm, multiform_factory  # noqa: F401
 from .registry import NamespaceRegistry, app_registry  # noqa: F401
@@ -1,16 +1,60 @@
-from functools import partial
-
 from django import forms
-from django.contrib.admin.options import InlineModelAdmin, ModelAdmin
+from django.contrib.admin.options import BaseModelAdmin, InlineModelAdmin, ModelAdmin
 from django.contrib.admin.utils import flatten_fieldsets
 from django.forms.models import modelform_defines_fields
 
 from app_data.forms import AppDataBaseInlineFormSet, MultiForm, multiform_factory, multiinlineformset_factory
 
+# hooks that can make generated form fields depend on the request
+FORMFIELD_HOOKS = (
+    "formfield_for_dbfield",
+    "formfield_for_choice_field",
+    "formfield_for_foreignkey",
+    "formfield_for_manytomany",
+)
+
+# admin options used by formfield_for_dbfield
+FORMFIELD_OPTIONS = (
+    "formfield_overrides",
+    "raw_id_fields",
+    "radio_fields",
+    "autocomplete_fields",
+    "filter_horizontal",
+    "filter_vertical",
+)
+
+
+def freeze(value):
+    """Return hashable version of value built from dicts, lists, tuples and sets."""
+    if isinstance(value, dict):
+        return frozenset((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    return value
+
+
+class FormfieldCallback:
+    """
+    ``formfield_callback`` of generated form classes passing the request to
+    the admin's ``formfield_for_dbfield``. A new one is built for each call,
+    cached form classes release the request once they are generated.
+    """
+
+    def __init__(self, model_admin, request):
+        self.model_admin = model_admin
+        self.request = request
+
+    def __call__(self, db_field, **kwargs):
+        return self.model_admin.formfield_for_dbfield(db_field, request=self.request, **kwargs)
+
 
 class AppDataAdminMixin:
     multiform = MultiForm
     app_form_opts = {}
+    # maximum number of generated form classes kept by the admin, 0 disables the cache
+    form_cache_size = 128
 
     def get_fieldsets(self, request, obj=None):
         try:
@@ -71,7 +115,7 @@ class AppDataAdminMixin:
             "form_opts": form_opts,
             "fields": fields,
             "exclude": exclude,
-            "formfield_callback": partial(self.formfield_for_dbfield, request=request),
+            "formfield_callback": FormfieldCallback(self, request),
         }
         defaults.update(kwargs)
 
@@ -82,6 +126,64 @@ class AppDataAdminMixin:
 
         return defaults
 
+    def get_form_cache_key(self, request, obj=None):
+        """
+        Return the request dependent part of the key generated form classes are
+        cached under, ``None`` to not use the cache. The generated fields
+        depend on the request through permissions (related field widgets) and
+        ordering (choices) of the related models' admins, if you override any
+        of the ``formfield_for_*`` hooks you need to override this method as
+        well to enable the cache.
+        """
+        opts = type(self)
+        if any(getattr(opts, hook) is not getattr(BaseModelAdmin, hook) for hook in FORMFIELD_HOOKS):
+            return None
+        permissions = []
+        for field in self.model._meta.get_fields():
+            if not field.is_relation or field.auto_created or not field.concrete and not field.many_to_many:
+                continue
+            related_admin = self.admin_site._registry.get(field.remote_field.model)
+            if related_admin is not None:
+                permissions.append(
+                    (
+                        field.name,
+                        related_admin.has_add_permission(request),
+                        related_admin.has_change_permission(request),
+                        related_admin.has_delete_permission(request),
+                        related_admin.has_view_permission(request),
+                        freeze(related_admin.get_ordering(request)),
+                    )
+                )
+        return tuple(permissions)
+
+    def _get_cached_form_class(self, request, obj, factory, *args, **defaults):
+        """Call factory(*args, **defaults) or return the class it returned for the same options before."""
+        key = self.get_form_cache_key(request, obj) if self.form_cache_size else None
+        if key is not None:
+            options = {k: v for k, v in defaults.items() if k != "formfield_callback"}
+            key = (key, freeze({name: getattr(self, name, None) for name in FORMFIELD_OPTIONS}), freeze(options))
+            try:
+                hash(key)
+            except TypeError:
+                key = None
+        if key is None:
+            return factory(*args, **defaults)
+
+        cache = self.__dict__.setdefault("_form_class_cache", {})
+        try:
+            return cache[key]
+        except KeyError:
+            pass
+        form_class = factory(*args, **defaults)
+        callback = defaults.get("formfield_callback")
+        if isinstance(callback, FormfieldCallback):
+            # the class outlives the request it was generated for
+            callback.request = None
+        if len(cache) >= self.form_cache_size:
+            cache.clear()
+        cache[key] = form_class
+        return form_class
+
 
 class AppDataModelAdmin(AppDataAdminMixin, ModelAdmin):
     def get_form(self, request, obj=None, change=False, **kwargs):
@@ -91,7 +193,9 @@ class AppDataModelAdmin(AppDataAdminMixin, ModelAdmin):
         """
         if self.multiform is None:
             return super().get_form(request, obj=obj, **kwargs)
-        return multiform_factory(self.model, **self._get_form_factory_opts(request, obj, **kwargs))
+        return self._get_cached_form_class(
+            request, obj, multiform_factory, self.model, **self._get_form_factory_opts(request, obj, **kwargs)
+        )
 
 
 class AppDataInlineModelAdmin(AppDataAdminMixin, InlineModelAdmin):
@@ -111,7 +215,9 @@ class AppDataInlineModelAdmin(AppDataAdminMixin, InlineModelAdmin):
             "can_delete": can_delete,
         }
         defaults.update(self._get_form_factory_opts(request, obj, **kwargs))
-        return multiinlineformset_factory(self.parent_model, self.model, **defaults)
+        return self._get_cached_form_class(
+            request, obj, multiinlineformset_factory, self.parent_model, self.model, **defaults
+        )
 
 
 class AppDataStackedInline(AppDataInlineModelAdmin):
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+class AppDataConfig(AppConfig):
+    name = "app_data"
+    verbose_name = "App data"
+    default_auto_field = "django.db.models.AutoField"
+
+    def ready(self):
+        from . import external
+
+        post_save.connect(external.save_external_data, dispatch_uid="app_data_save_external_data")
+        post_delete.connect(external.delete_external_data, dispatch_uid="app_data_delete_external_data")
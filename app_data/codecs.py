@@ -0,0 +1,161 @@
+import json
+import re
+from functools import cache
+from json.decoder import JSONDecodeError, scanstring
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+NESTED_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.DOTALL)
+SCALAR = re.compile(r"[^,}\]\s]+")
+
+
+class RawJSON:
+    """Undecoded JSON fragment of a single namespace."""
+
+    __slots__ = ("raw",)
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def __repr__(self):
+        return f"<RawJSON: {self.raw}>"
+
+    def __eq__(self, other):
+        if isinstance(other, RawJSON):
+            return self.raw == other.raw
+        return NotImplemented
+
+    def __reduce__(self):
+        return (RawJSON, (self.raw,))
+
+    def decode(self, loads=json.loads):
+        return loads(self.raw)
+
+
+def _skip_value(s, pos):
+    """Return the index just after the JSON value starting at ``pos``."""
+    char = s[pos : pos + 1]
+    if char == '"':
+        match = STRING.match(s, pos)
+    elif char in ("{", "["):
+        depth = 0
+        for match in NESTED_TOKEN.finditer(s, pos):
+            char = s[match.start()]
+            if char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        match = None
+    else:
+        match = SCALAR.match(s, pos)
+
+    if match is None:
+        raise JSONDecodeError("Expecting value", s, pos)
+    return match.end()
+
+
+def split_namespaces(s):
+    """
+    Split the top level of a JSON object into ``{key: RawJSON}`` without
+    decoding the values. Anything but an object is decoded as a whole.
+    """
+    ws = WHITESPACE.match
+    pos = ws(s, 0).end()
+    if s[pos : pos + 1] != "{":
+        return json.loads(s)
+
+    result = {}
+    pos = ws(s, pos + 1).end()
+    if s[pos : pos + 1] == "}":
+        return result
+
+    while True:
+        if s[pos : pos + 1] != '"':
+            raise JSONDecodeError("Expecting property name enclosed in double quotes", s, pos)
+        key, pos = scanstring(s, pos + 1)
+        pos = ws(s, pos).end()
+        if s[pos : pos + 1] != ":":
+            raise JSONDecodeError("Expecting ':' delimiter", s, pos)
+        start = ws(s, pos + 1).end()
+        end = _skip_value(s, start)
+        result[key] = RawJSON(s[start:end])
+
+        pos = ws(s, end).end()
+        char = s[pos : pos + 1]
+        if char == "}":
+            return result
+        if char != ",":
+            raise JSONDecodeError("Expecting ',' delimiter", s, pos)
+        pos = ws(s, pos + 1).end()
+
+
+class JSONCodec:
+    """
+    Encodes and decodes the data stored in ``AppDataField`` using stdlib
+    ``json`` with its default separators.
+
+    Subclass and override ``dumps`` and ``loads`` to plug in a different
+    (faster) JSON implementation.
+    """
+
+    item_separator = ", "
+    key_separator = ": "
+    sort_keys = False
+
+    def dumps(self, value):
+        return json.dumps(value, separators=(self.item_separator, self.key_separator), sort_keys=self.sort_keys)
+
+    def loads(self, value):
+        return json.loads(value)
+
+    def dumps_namespaces(self, data):
+        """Encode top level data, writing undecoded namespaces back verbatim."""
+        if not any(isinstance(value, RawJSON) for value in data.values()):
+            return self.dumps(data)
+        items = sorted(data.items()) if self.sort_keys else data.items()
+        body = self.item_separator.join(
+            self.dumps(key) + self.key_separator + (value.raw if isinstance(value, RawJSON) else self.dumps(value))
+            for key, value in items
+        )
+        return "{" + body + "}"
+
+
+class CompactJSONCodec(JSONCodec):
+    """JSON without any whitespace between items and keys."""
+
+    item_separator = ","
+    key_separator = ":"
+
+
+class CanonicalJSONCodec(CompactJSONCodec):
+    """
+    Compact JSON with sorted keys so that equal data always encode to the same
+    string. Undecoded namespaces of a lazy field are written back as they were
+    read so they are only canonical if they were stored by this codec.
+    """
+
+    sort_keys = True
+
+
+@cache
+def _load_codec(codec):
+    if isinstance(codec, str):
+        codec = import_string(codec)
+    return codec()
+
+
+def get_codec(codec=None):
+    """
+    Return codec instance for given codec, its class or dotted path to it.
+    Defaults to ``settings.APP_DATA_CODEC`` or ``JSONCodec``.
+    """
+    if codec is None:
+        codec = getattr(settings, "APP_DATA_CODEC", JSONCodec)
+    if isinstance(codec, (str, type)):
+        return _load_codec(codec)
+    return codec
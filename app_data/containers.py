@@ -1,16 +1,156 @@
+import datetime
+import decimal
+import uuid
+from collections import OrderedDict
 from copy import copy
+from threading import Lock
 
+from asgiref.sync import sync_to_async
 from django.core.exceptions import ValidationError
+from django.forms import ModelChoiceField
+from django.utils import timezone, translation
 
+from . import instrumentation
+from .codecs import RawJSON, get_codec
 from .forms import AppDataForm
 from .registry import app_registry
 
+IMMUTABLE_TYPES = (
+    type(None),
+    bool,
+    int,
+    float,
+    str,
+    bytes,
+    decimal.Decimal,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    uuid.UUID,
+)
+
+
+def is_immutable(value):
+    if isinstance(value, (tuple, frozenset)):
+        return all(is_immutable(v) for v in value)
+    return isinstance(value, IMMUTABLE_TYPES)
+
+
+class FieldCodec:
+    """
+    Clean-on-read and prepare-on-write of values of a single form field,
+    with the widget formatting resolved once instead of on every write.
+
+    With ``cache_size`` the cleaned values of hashable stored values are kept
+    in a LRU cache of that size. Only immutable results, or lists, dicts and
+    sets of immutable values (returned as copies) are cached. Cleaning may
+    depend on the active time zone and language, so both are part of the key.
+    """
+
+    def __init__(self, field, cache_size=None):
+        self.field = field
+        self.clean = field.clean
+        if cache_size:
+            self.cache_size = cache_size
+            self._cache = OrderedDict()
+            self._lock = Lock()
+            self.clean = self._cached_clean
+        self.prepare_value = field.prepare_value
+        # Choices fields must not be formatted because we need the python value, not the formatted one
+        self.format_value = None
+        if not hasattr(field, "choices"):
+            widget = field.widget
+            if hasattr(widget, "format_value"):
+                self.format_value = widget.format_value
+            elif hasattr(widget, "_format_value"):
+                self.format_value = widget._format_value
+
+    @property
+    def initial(self):
+        return self.field.initial
+
+    def _cached_clean(self, value):
+        key = (type(value), value, timezone.get_current_timezone_name(), translation.get_language())
+        try:
+            with self._lock:
+                result = self._cache[key]
+                self._cache.move_to_end(key)
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable
+            return self.field.clean(value)
+        else:
+            return copy(result) if isinstance(result, (list, dict, set)) else result
+
+        result = self.field.clean(value)
+        if isinstance(result, (list, set)):
+            cacheable = all(is_immutable(v) for v in result)
+        elif isinstance(result, dict):
+            cacheable = all(is_immutable(k) and is_immutable(v) for k, v in result.items())
+        else:
+            cacheable = is_immutable(result)
+        if cacheable:
+            with self._lock:
+                self._cache[key] = copy(result)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def cache_clear(self):
+        if hasattr(self, "_cache"):
+            with self._lock:
+                self._cache.clear()
+
+    def serialize(self, value):
+        """Use form field to convert python value into the stored one."""
+        value = self.prepare_value(value)
+        # Widget.format_value in 1.11 has a different semantic than Widget._format_value in previous versions
+        # in case the value is *exactly* True / False / None returns None
+        # To handle this we pick the formatted value *only if* both formatted and original values evaluates to true
+        if value and self.format_value is not None:
+            new_value = self.format_value(value)
+            if new_value:
+                value = new_value
+        return value
+
+
+def serialize_value(field, value):
+    """Use form field to convert python value into the stored one."""
+    return FieldCodec(field).serialize(value)
+
+
+MISSING = object()
+
 
 class AppDataContainerFactory(dict):
+    __slots__ = (
+        "_app_registry",
+        "_codec",
+        "_external",
+        "_field",
+        "_instance",
+        "_model",
+        "_snapshot",
+        "_touched",
+        "_written",
+    )
+
     def __init__(self, model_instance, *args, **kwargs):
         self._model = model_instance.__class__
         self._instance = model_instance
         self._app_registry = kwargs.pop("app_registry", app_registry)
+        self._codec = kwargs.pop("codec", None) or get_codec()
+        # data as stored in the database (encoded or decoded), None if unknown
+        self._snapshot = kwargs.pop("snapshot", None)
+        # data last handed to the database, not yet confirmed by _mark_saved()
+        self._written = None
+        # set when data might have been modified without accessing a container
+        self._touched = False
+        # field the data belong to, set by the descriptor
+        self._field = None
+        # {namespace: encoded data or None} of external namespaces loaded from or written to the database
+        self._external = {}
         super().__init__(*args, **kwargs)
 
     def __repr__(self):
@@ -34,39 +174,203 @@ class AppDataContainerFactory(dict):
         except KeyError:
             if class_ is None:
                 raise
-            val = class_(self._instance)
-            self[name] = val
+            stored = self._get_loaded_external(name)
+            val = class_(self._instance) if stored is None else class_(self._instance, self._codec.loads(stored))
+            val._namespace = name
+            super().__setitem__(name, val)
         else:
             if class_ is not None and not isinstance(val, class_):
                 val = class_(self._instance, val)
-                self[name] = val
+                val._namespace = name
+                super().__setitem__(name, val)
+            elif class_ is None:
+                # plain values can be modified in place
+                self._touched = True
 
         return val
 
+    def __setitem__(self, name, value):
+        self._touched = True
+        super().__setitem__(name, value)
+
+    def __delitem__(self, name):
+        self._touched = True
+        self._load_external(name)
+        super().__delitem__(name)
+
+    def clear(self):
+        self._touched = True
+        super().clear()
+
+    def pop(self, *args):
+        self._touched = True
+        if args:
+            self._load_external(args[0])
+        return super().pop(*args)
+
+    def popitem(self):
+        self._touched = True
+        return super().popitem()
+
+    def setdefault(self, *args):
+        self._touched = True
+        return super().setdefault(*args)
+
+    def update(self, *args, **kwargs):
+        self._touched = True
+        super().update(*args, **kwargs)
+
+    def items(self):
+        self._touched = True
+        return super().items()
+
+    def values(self):
+        self._touched = True
+        return super().values()
+
     def __reduce__(self):
         return (dict, (self.serialize(),))
 
     def validate(self, model_instance):
         errors = {}
-        for key, value in self.items():
+        for key, value in super().items():
             if hasattr(value, "validate") and getattr(value, "accessed", True):
                 try:
-                    value.validate(self, model_instance)
+                    if instrumentation.active:
+                        instrumentation.call(self._model, key, "validate", value.validate, self, model_instance)
+                    else:
+                        value.validate(self, model_instance)
                 except ValidationError as e:
                     errors[key] = e.message_dict
         if errors:
             raise ValidationError(errors)
 
+    async def avalidate(self, model_instance):
+        """Async counterpart of ``validate``, run in a thread as forms may query the database."""
+        await sync_to_async(self.validate)(model_instance)
+
+    def _get_loaded_external(self, name):
+        """Return encoded data of external namespace ``name``, loading them first if necessary."""
+        if name in self._get_external() and name not in self._external:
+            from .external import load_external
+
+            self._external[name] = load_external(self, name)
+        return self._external.get(name)
+
+    def _load_external(self, name):
+        # removing a namespace that hasn't been loaded needs to know whether there's a row to delete
+        if not super().__contains__(name) and self._get_loaded_external(name) is not None:
+            self[name]
+
+    def _get_external(self):
+        """Return namespaces stored in the ExternalAppData table instead of the field."""
+        if self._field is None:
+            return frozenset()
+        return self._app_registry.get_external_namespaces(self._model)
+
     def serialize(self):
-        for key, value in self.items():
+        """Return data of the factory as plain objects, leaving out external namespaces."""
+        return self._serialize()
+
+    def _serialize(self):
+        """Return data to store in the field, undecoded namespaces of lazy factories stay ``RawJSON``."""
+        for key, value in super().items():
             if isinstance(value, AppDataContainer):
-                value = value.serialize() if value.accessed else value._data
+                if value.accessed:
+                    # the container is gone, compare the data from now on
+                    self._touched = True
+                    if instrumentation.active:
+                        value = instrumentation.call(self._model, key, "serialize", value.serialize)
+                    else:
+                        value = value.serialize()
+                else:
+                    value = value._data
                 super().__setitem__(key, value)
+        external = self._get_external()
+        if external:
+            return {key: value for key, value in super().items() if key not in external}
         # return a copy so that it's a fresh dict, not AppDataContainerFactory
-        return self.copy()
+        return dict(super().items())
+
+    def _get_baseline(self):
+        if isinstance(self._snapshot, str):
+            self._snapshot = self._codec.loads(self._snapshot)
+        return self._snapshot
+
+    def _get_stored(self, name):
+        value = self._get_baseline().get(name, MISSING)
+        if isinstance(value, RawJSON):
+            value = value.decode(self._codec.loads)
+        return value
+
+    def _maybe_changed(self):
+        # data can only change through the factory's methods or accessed containers
+        return self._touched or any(
+            isinstance(value, AppDataContainer) and value.accessed for value in super().values()
+        )
+
+    def _stores_external(self):
+        """Return a boolean indicating whether the stored data contain namespaces that are external now."""
+        external = self._get_external()
+        return bool(external) and any(key in external for key in self._get_baseline())
+
+    def _changed_namespaces(self):
+        changed = []
+        external = self._get_external()
+        for key, value in super().items():
+            if isinstance(value, RawJSON) or key in external:
+                # undecoded, will be written back verbatim, or not stored in the field
+                continue
+            stored = self._get_stored(key)
+            if isinstance(value, AppDataContainer):
+                if value._changed_from({} if stored is MISSING else stored):
+                    changed.append(key)
+            elif value != stored:
+                changed.append(key)
+        return changed
+
+    def has_changed(self):
+        """Return a boolean indicating whether the data differ from the ones stored in the database."""
+        if self._snapshot is None or self._stores_external():
+            return True
+        if not self._maybe_changed():
+            return False
+        return bool(self._changed_namespaces()) or any(key not in self for key in self._get_baseline())
+
+    def _get_patch(self):
+        """
+        Return a ``(set, remove)`` tuple of encoded namespaces to write and
+        names of namespaces to delete to turn the stored data into the current
+        ones, ``None`` if the stored data aren't known.
+        """
+        # a previous write that wasn't confirmed by _mark_saved() leaves the stored data unknown
+        if self._snapshot is None or self._written is not None:
+            return None
+        if not self._maybe_changed() and not self._stores_external():
+            return {}, []
+
+        changed = self._changed_namespaces()
+        data = self._serialize()
+        baseline = dict(self._get_baseline())
+        remove = [key for key in baseline if key not in data]
+        for key in remove:
+            del baseline[key]
+        set_ = {}
+        for key in changed:
+            set_[key] = self._codec.dumps(data[key])
+            baseline[key] = RawJSON(set_[key])
+        self._written = baseline
+        return set_, remove
+
+    def _mark_saved(self):
+        """Use the data just written to the database as the new baseline."""
+        if self._written is None:
+            self._written = self._codec.dumps_namespaces(self._serialize())
+        self._snapshot, self._written = self._written, None
+        self._touched = False
 
     def get(self, name, default=None):
-        if name in self:
+        if name in self or name in self._get_external():
             return self[name]
 
         if default is None:
@@ -74,23 +378,116 @@ class AppDataContainerFactory(dict):
 
         class_ = self._app_registry.get_class(name, self._model)
         if class_ is not None and not isinstance(default, class_):
-            return class_(self._instance, default)
+            val = class_(self._instance, default)
+            val._namespace = name
+            return val
 
         return default
 
+    async def aget(self, name, default=None):
+        """Async counterpart of ``get`` loading external namespaces with the async ORM."""
+        if not super().__contains__(name) and name in self._get_external() and name not in self._external:
+            from .external import aload_external
+
+            self._external[name] = await aload_external(self, name)
+        return self.get(name, default)
+
+
+class LazyAppDataContainerFactory(AppDataContainerFactory):
+    """
+    Container factory holding namespaces as undecoded ``RawJSON`` fragments.
+    Each namespace is decoded on first access, untouched ones are serialized
+    back verbatim.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return f"<LazyAppDataContainerFactory: {dict.__repr__(self)}>"
+
+    def _decode(self, name):
+        value = dict.get(self, name)
+        if isinstance(value, RawJSON):
+            if instrumentation.active:
+                value = instrumentation.call(
+                    self._model, name, "decode", value.decode, self._codec.loads, size=len(value.raw)
+                )
+            else:
+                value = value.decode(self._codec.loads)
+            dict.__setitem__(self, name, value)
+        return value
+
+    def _decode_all(self):
+        for key, value in list(dict.items(self)):
+            if isinstance(value, RawJSON):
+                self._decode(key)
+
+    def __getitem__(self, name):
+        self._decode(name)
+        return super().__getitem__(name)
+
+    def __iter__(self):
+        # unlike dict's own, it makes dict() and ** unpacking read the values through __getitem__
+        return super().__iter__()
+
+    def copy(self):
+        self._decode_all()
+        return dict(dict.items(self))
+
+    def pop(self, *args):
+        if args:
+            self._decode(args[0])
+        return super().pop(*args)
+
+    def popitem(self):
+        key, value = super().popitem()
+        return key, value.decode(self._codec.loads) if isinstance(value, RawJSON) else value
+
+    def setdefault(self, *args):
+        self._decode(args[0])
+        return super().setdefault(*args)
+
+    def serialize(self):
+        # untouched namespaces stay undecoded in the factory so that they are still written verbatim
+        data = self._serialize()
+        for key, value in data.items():
+            if isinstance(value, RawJSON):
+                data[key] = value.decode(self._codec.loads)
+        return data
+
+    def __eq__(self, other):
+        self._decode_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def items(self):
+        self._decode_all()
+        return super().items()
+
+    def values(self):
+        self._decode_all()
+        return super().values()
+
 
 INITIAL = object()
 
 
 class AppDataContainer:
+    # subclasses should define __slots__ too (from_form does) to keep instances compact
+    __slots__ = ("_accessed", "_attr_cache", "_data", "_form_codecs", "_form_instance", "_instance", "_namespace")
+
     form_class = AppDataForm
+    # size of the per-field LRU cache of cleaned values shared by all instances, None to disable
+    clean_cache_size = None
 
     @classmethod
     def from_form(cls, form_class):
         return type(
             "%sAppDataContainer" % form_class.__name__,
             (cls,),
-            {"fields": {}, "form_class": form_class},
+            {"__slots__": (), "fields": {}, "form_class": form_class},
         )
 
     @property
@@ -103,6 +500,8 @@ class AppDataContainer:
         self._attr_cache = {}
         self._accessed = False
         self._instance = model_instance
+        # set by the container factory
+        self._namespace = None
 
     def __repr__(self):
         return "<{}: {!r}>".format(self.__class__.__name__, self.serialize())
@@ -114,6 +513,32 @@ class AppDataContainer:
             return other == self.serialize()
         return False
 
+    @classmethod
+    def get_field_codecs(cls):
+        """
+        Return codecs of the form's fields compiled once for the class, or
+        ``None`` if a form instance is needed to know the fields (the form
+        class or ``get_form`` customize them).
+        """
+        if "_field_codecs" not in cls.__dict__:
+            codecs = None
+            if cls.get_form is AppDataContainer.get_form and cls.form_class.__init__ is AppDataForm.__init__:
+                codecs = {
+                    name: FieldCodec(field, cls.clean_cache_size) for name, field in cls.form_class.base_fields.items()
+                }
+            cls._field_codecs = codecs
+        return cls._field_codecs
+
+    @property
+    def _codecs(self):
+        """Codecs used to clean/serialize field values."""
+        codecs = self.get_field_codecs()
+        if codecs is None:
+            if not hasattr(self, "_form_codecs"):
+                self._form_codecs = {name: FieldCodec(field) for name, field in self._form.fields.items()}
+            codecs = self._form_codecs
+        return codecs
+
     @property
     def _form(self):
         """Form instance used to clean/(de)serialize field values."""
@@ -124,7 +549,7 @@ class AppDataContainer:
     def __setitem__(self, name, value):
         self._accessed = True
         # if dealing with defined field...
-        if name in self._form.fields:
+        if name in self._codecs:
             # ..store the original - do not serialize, do not store in _data
             self._attr_cache[name] = value
         else:
@@ -141,14 +566,22 @@ class AppDataContainer:
     def __getitem__(self, name):
         self._accessed = True
 
-        # defined field, still uncleaned, retrieve from self._form and put in cache
-        if name in self._form.fields and name not in self._attr_cache:
-            field = self._form.fields[name]
+        if instrumentation.active and name in self._codecs:
+            instrumentation.record_read(type(self._instance), self._namespace, name)
+
+        # defined field, still uncleaned, clean it and put in cache
+        if name not in self._attr_cache and name in self._codecs:
+            field = self._codecs[name]
             # we want to invoke clean, even on initial values. otherwise it's
             # quite inelegant to work with collection types like lists, as
             # initial=[] will lead to a single list instance being used for all
             # instances.
-            self._attr_cache[name] = field.clean(self._data.get(name, field.initial))
+            value = self._data.get(name, field.initial)
+            if instrumentation.active:
+                value = instrumentation.call(type(self._instance), self._namespace, "clean", field.clean, value)
+            else:
+                value = field.clean(value)
+            self._attr_cache[name] = value
 
         # defined field stored in cache, return it
         if name in self._attr_cache:
@@ -180,34 +613,68 @@ class AppDataContainer:
                 return None
             return default
 
+    async def aget(self, name, default=INITIAL):
+        """
+        Async counterpart of ``get`` resolving references of model choice
+        fields with the async ORM instead of querying from the event loop.
+        """
+        field = self._codecs.get(name)
+        if name not in self._attr_cache and field is not None and isinstance(field.field, ModelChoiceField):
+            from .query import aprefetch_model_field
+
+            await aprefetch_model_field([self], name, field.field)
+            if name not in self._attr_cache:
+                # empty or invalid, let the form field clean (and report) it
+                return await sync_to_async(self.get)(name, default)
+        return self.get(name, default)
+
     def update(self, data):
         for k, v in data.items():
             self[k] = v
 
+    def _is_default(self, name, value):
+        """Whether value is what reading the field would produce if it wasn't stored."""
+        field = self._codecs.get(name)
+        if field is None:
+            return False
+        try:
+            return value == field.serialize(field.clean(field.initial))
+        except ValidationError:
+            return False
+
+    def _changed_from(self, stored):
+        """
+        Compare the data with the stored ones. Fields missing from the stored
+        data that only hold their (cleaned) initial value, e.g. after being
+        read, don't count as a change.
+        """
+        data = self.serialize() if self._accessed else self._data
+        if data == stored:
+            return False
+        if any(name not in data for name in stored):
+            return True
+        for name, value in data.items():
+            if name in stored:
+                if value != stored[name]:
+                    return True
+            elif not self._is_default(name, value):
+                return True
+        return False
+
     def validate(self, app_data, model_instance):
         self.serialize()
         form = self.get_form(self._data)
         if not form.is_valid():
             raise ValidationError(form.errors)
 
+    async def avalidate(self, app_data, model_instance):
+        """Async counterpart of ``validate``, run in a thread as the form may query the database."""
+        await sync_to_async(self.validate)(app_data, model_instance)
+
     def serialize(self):
-        """Go through attribute cache and use ._form to serialze those values into ._data."""
+        """Go through attribute cache and use field codecs to serialze those values into ._data."""
         for name, value in self._attr_cache.items():
-            f = self._form.fields[name]
-            value = f.prepare_value(value)
-            # Widget.format_value in 1.11 has a different semantic than Widget._format_value in previous versions
-            # in case the value is *exactly* True / False / None returns None
-            # To handle this we pick the formatted value *only if* both formatted and original values evaluates to true
-            # Choices fields must not be formatted because we need the python value, not the formatted one
-            new_value = None
-            if not hasattr(f, "choices"):
-                if hasattr(f.widget, "format_value"):
-                    new_value = f.widget.format_value(value)
-                elif hasattr(f.widget, "_format_value"):
-                    new_value = f.widget._format_value(value)
-            if value and new_value:
-                value = new_value
-            self._data[name] = value
+            self._data[name] = self._codecs[name].serialize(value)
         return self._data
 
     def get_form(self, data=None, files=None, fields=(), exclude=(), form_class=None, **kwargs):
@@ -0,0 +1,159 @@
+import json
+
+from django.db import NotSupportedError
+from django.db.models import BooleanField, F, JSONField
+from django.db.models.expressions import Expression
+
+
+def json_path(*keys):
+    # always quoted, numeric namespaces aren't array indexes
+    return "$" + "".join(f".{json.dumps(key)}" for key in keys)
+
+
+def supports_json_edits(connection):
+    """Return a boolean indicating whether ``MoveJSONPath`` and ``HasJSONPath`` compile on connection."""
+    if connection.vendor not in ("sqlite", "mysql", "postgresql") or not connection.features.supports_json_field:
+        return False
+    # the -> operator keeps the JSON types of the extracted values
+    return connection.vendor != "sqlite" or connection.Database.sqlite_version_info >= (3, 38)
+
+
+class AppDataExpression(Expression):
+    """Expression over the value stored in an AppData field."""
+
+    def __init__(self, field, output_field=None):
+        super().__init__(output_field=output_field or field)
+        self.app_data_field = field
+        self.lhs = F(field.attname)
+
+    def get_source_expressions(self):
+        return [self.lhs]
+
+    def set_source_expressions(self, exprs):
+        (self.lhs,) = exprs
+
+    def _compile_jsonb(self, compiler, connection):
+        sql, params = compiler.compile(self.lhs)
+        if not isinstance(self.app_data_field, JSONField):
+            sql = f"({sql})::jsonb"
+        return sql, list(params)
+
+    def _jsonb_to_field(self, sql):
+        return sql if isinstance(self.app_data_field, JSONField) else f"({sql})::text"
+
+
+class PatchNamespaces(AppDataExpression):
+    """
+    Write only the given namespaces of app_data using the database's JSON
+    functions, leaving the rest of the stored object untouched.
+
+    ``set_`` maps namespaces to their JSON encoded data, ``remove`` lists
+    namespaces to delete. ``value`` is the whole value, written as usual on
+    databases without JSON patching support.
+    """
+
+    def __init__(self, field, value, set_, remove):
+        super().__init__(field)
+        self.value = value
+        self.set_ = set_
+        self.remove = remove
+
+    def as_sql(self, compiler, connection):
+        return "%s", [self.output_field.get_db_prep_save(self.value, connection)]
+
+    def _as_json_path_sql(self, compiler, connection, value_template):
+        sql, params = compiler.compile(self.lhs)
+        params = list(params)
+        if self.remove:
+            sql = "JSON_REMOVE({}, {})".format(sql, ", ".join(["%s"] * len(self.remove)))
+            params.extend(json_path(key) for key in self.remove)
+        if self.set_:
+            sql = "JSON_SET({}, {})".format(sql, ", ".join([f"%s, {value_template}"] * len(self.set_)))
+            for key, value in self.set_.items():
+                params.extend((json_path(key), value))
+        return sql, params
+
+    def as_sqlite(self, compiler, connection):
+        return self._as_json_path_sql(compiler, connection, "JSON(%s)")
+
+    def as_mysql(self, compiler, connection):
+        # CAST(... AS JSON) isn't supported by MariaDB
+        return self._as_json_path_sql(compiler, connection, "JSON_EXTRACT(%s, '$')")
+
+    def as_postgresql(self, compiler, connection):
+        sql, params = self._compile_jsonb(compiler, connection)
+        for key in self.remove:
+            sql = f"({sql} - %s)"
+            params.append(key)
+        for key, value in self.set_.items():
+            sql = f"jsonb_set({sql}, %s, %s::jsonb)"
+            params.extend(([key], value))
+        return self._jsonb_to_field(sql), params
+
+
+class MoveJSONPath(AppDataExpression):
+    """
+    Move the value under the ``source`` keys of the stored object to the
+    ``target`` keys, creating missing objects on the way. Only use it on rows
+    containing the source (see ``HasJSONPath``).
+    """
+
+    def __init__(self, field, source, target):
+        super().__init__(field)
+        self.source = tuple(source)
+        self.target = tuple(target)
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError(f"Moving JSON values is not supported on {connection.vendor}.")
+
+    def _as_json_path_sql(self, compiler, connection, extract_template):
+        lhs, lhs_params = compiler.compile(self.lhs)
+        lhs_params = list(lhs_params)
+        sql, params = lhs, list(lhs_params)
+        for i in range(1, len(self.target)):
+            sql = f"JSON_INSERT({sql}, %s, JSON_OBJECT())"
+            params.append(json_path(*self.target[:i]))
+        sql = f"JSON_SET({sql}, %s, {extract_template % lhs})"
+        params.extend([json_path(*self.target), *lhs_params, json_path(*self.source)])
+        sql = f"JSON_REMOVE({sql}, %s)"
+        params.append(json_path(*self.source))
+        return sql, params
+
+    def as_sqlite(self, compiler, connection):
+        return self._as_json_path_sql(compiler, connection, "%s -> %%s")
+
+    def as_mysql(self, compiler, connection):
+        return self._as_json_path_sql(compiler, connection, "JSON_EXTRACT(%s, %%s)")
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self._compile_jsonb(compiler, connection)
+        sql, params = lhs, list(lhs_params)
+        for i in range(1, len(self.target)):
+            sql = f"jsonb_set({sql}, %s, COALESCE({lhs} #> %s, '{{}}'::jsonb))"
+            params.extend([list(self.target[:i]), *lhs_params, list(self.target[:i])])
+        sql = f"(jsonb_set({sql}, %s, {lhs} #> %s) #- %s)"
+        params.extend([list(self.target), *lhs_params, list(self.source), list(self.source)])
+        return self._jsonb_to_field(sql), params
+
+
+class HasJSONPath(AppDataExpression):
+    """Condition matching rows whose stored object contains the given keys."""
+
+    def __init__(self, field, *keys):
+        super().__init__(field, output_field=BooleanField())
+        self.keys = keys
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError(f"Looking up JSON paths is not supported on {connection.vendor}.")
+
+    def as_sqlite(self, compiler, connection):
+        sql, params = compiler.compile(self.lhs)
+        return f"JSON_TYPE({sql}, %s) IS NOT NULL", [*params, json_path(*self.keys)]
+
+    def as_mysql(self, compiler, connection):
+        sql, params = compiler.compile(self.lhs)
+        return f"JSON_CONTAINS_PATH({sql}, 'one', %s)", [*params, json_path(*self.keys)]
+
+    def as_postgresql(self, compiler, connection):
+        sql, params = self._compile_jsonb(compiler, connection)
+        return f"({sql} #> %s) IS NOT NULL", [*params, list(self.keys)]
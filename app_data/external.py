@@ -0,0 +1,140 @@
+from asgiref.sync import sync_to_async
+from django.contrib.contenttypes.models import ContentType
+
+from .codecs import RawJSON
+from .containers import AppDataContainer, AppDataContainerFactory
+from .models import ExternalAppData, get_app_data_fields
+
+
+def get_content_type(field, using):
+    # rows belong to the model the field is defined on so that multi-table inheritance children share them
+    return ContentType.objects.db_manager(using).get_for_model(field.model)
+
+
+def get_rows(field, using, namespace=None):
+    rows = ExternalAppData.objects.using(using).filter(content_type=get_content_type(field, using))
+    return rows if namespace is None else rows.filter(namespace=namespace)
+
+
+def get_rows_by_model(field, using, namespace):
+    # joins the content type instead of looking it up, which may query the database, for the async ORM
+    opts = field.model._meta
+    return ExternalAppData.objects.using(using).filter(
+        content_type__app_label=opts.app_label, content_type__model=opts.model_name, namespace=namespace
+    )
+
+
+def load_external(factory, namespace):
+    """Return encoded data of the factory's external namespace, None if there aren't any."""
+    instance = factory._instance
+    if instance._state.adding or instance.pk is None:
+        return None
+    rows = get_rows(factory._field, instance._state.db, namespace).filter(object_id=str(instance.pk))
+    return next(iter(rows.values_list("data", flat=True)[:1]), None)
+
+
+async def aload_external(factory, namespace):
+    """Async counterpart of ``load_external`` using the async ORM."""
+    instance = factory._instance
+    if instance._state.adding or instance.pk is None:
+        return None
+    rows = get_rows_by_model(factory._field, instance._state.db, namespace).filter(object_id=str(instance.pk))
+    rows = rows.values_list("data", flat=True)
+    if hasattr(rows, "afirst"):
+        return await rows.afirst()
+    # no async ORM before Django 4.1
+    return await sync_to_async(rows.first)()
+
+
+def _get_pending(instances, field, namespace):
+    pending = {}
+    for instance in instances:
+        factory = getattr(instance, field.attname)
+        if instance._state.adding or namespace in factory or namespace in factory._external:
+            continue
+        pending.setdefault(instance._state.db, {})[str(instance.pk)] = factory
+    return pending
+
+
+def _set_loaded(factories, namespace, rows):
+    for object_id, factory in factories.items():
+        factory._external[namespace] = rows.get(object_id)
+
+
+def prefetch_external(instances, field, namespace):
+    """Load external namespace of all the instances with a single query per database."""
+    for using, factories in _get_pending(instances, field, namespace).items():
+        rows = get_rows(field, using, namespace).filter(object_id__in=factories).values_list("object_id", "data")
+        _set_loaded(factories, namespace, dict(rows))
+
+
+async def aprefetch_external(instances, field, namespace):
+    """Async counterpart of ``prefetch_external`` using the async ORM."""
+    for using, factories in _get_pending(instances, field, namespace).items():
+        rows = get_rows_by_model(field, using, namespace).filter(object_id__in=factories)
+        rows = rows.values_list("object_id", "data")
+        if hasattr(rows, "__aiter__"):
+            rows = {key: data async for key, data in rows}
+        else:
+            # no async ORM before Django 4.1
+            rows = await sync_to_async(dict)(rows)
+        _set_loaded(factories, namespace, rows)
+
+
+def _get_data(factory, value):
+    if isinstance(value, AppDataContainer):
+        return value.serialize() if value.accessed else value._data
+    if isinstance(value, RawJSON):
+        return value.decode(factory._codec.loads)
+    return value
+
+
+def save_external(factory, using):
+    """Write external namespaces of the factory that differ from the stored ones, delete removed ones."""
+    field = factory._field
+    object_id = str(factory._instance.pk)
+    for namespace in factory._get_external():
+        stored = factory._external.get(namespace)
+        if namespace not in factory:
+            if stored is not None:
+                get_rows(field, using, namespace).filter(object_id=object_id).delete()
+                factory._external[namespace] = None
+            continue
+
+        value = dict.__getitem__(factory, namespace)
+        if stored is not None:
+            stored_data = factory._codec.loads(stored)
+            if isinstance(value, AppDataContainer):
+                if not value._changed_from(stored_data):
+                    continue
+            elif value == stored_data:
+                continue
+
+        data = factory._codec.dumps(_get_data(factory, value))
+        rows = get_rows(field, using, namespace).filter(object_id=object_id)
+        # a missing namespace isn't known not to be stored unless it was loaded
+        if namespace not in factory._external or stored is not None:
+            updated = rows.update(data=data)
+        else:
+            updated = 0
+        if not updated:
+            ExternalAppData.objects.using(using).create(
+                content_type=get_content_type(field, using), object_id=object_id, namespace=namespace, data=data
+            )
+        factory._external[namespace] = data
+
+
+def save_external_data(sender, instance, using, **kwargs):
+    """post_save receiver writing the instance's external namespaces."""
+    for field in get_app_data_fields(sender):
+        factory = instance.__dict__.get(field.attname)
+        if isinstance(factory, AppDataContainerFactory) and field.app_registry.get_external_namespaces(sender):
+            factory._field = field
+            save_external(factory, using)
+
+
+def delete_external_data(sender, instance, using, **kwargs):
+    """post_delete receiver deleting the instance's external namespaces."""
+    for field in get_app_data_fields(sender):
+        if field.app_registry.get_external_namespaces(sender):
+            get_rows(field, using).filter(object_id=str(instance.pk)).delete()
@@ -1,10 +1,19 @@
-import json
+import zlib
+from time import perf_counter
 
 from django import forms
-from django.db.models import TextField
-from django.utils.encoding import smart_str
+from django.apps import apps
+from django.core.signals import setting_changed
+from django.db.models import BinaryField, JSONField, TextField
+from django.db.models.expressions import Col
+from django.db.models.fields.json import KeyTransformFactory
+from django.utils.functional import cached_property
 
-from .containers import AppDataContainerFactory
+from . import instrumentation
+from .codecs import RawJSON, get_codec, split_namespaces
+from .containers import AppDataContainerFactory, LazyAppDataContainerFactory
+from .expressions import PatchNamespaces
+from .lookups import HasNamespace, NamespaceTransformFactory
 from .registry import app_registry
 
 
@@ -14,64 +23,301 @@ class AppDataDescriptor:
     def __init__(self, field):
         self.field = field
 
+    def _decode(self, value):
+        """Decode value as stored in the database, return it along with the snapshot of it."""
+        if self.field.lazy:
+            value = split_namespaces(value)
+            return value, dict(value) if isinstance(value, dict) else None
+        return self.field.codec.loads(value), value
+
+    def _build(self, instance, value, snapshot=None):
+        factory = self.field.factory_class(
+            instance, value, app_registry=self.field.app_registry, codec=self.field.codec, snapshot=snapshot
+        )
+        factory._field = self.field
+        return factory
+
+    def _bind(self, factory, instance):
+        factory._instance = instance
+        factory._model = instance.__class__
+        factory._app_registry = self.field.app_registry
+        factory._codec = self.field.codec
+        factory._field = self.field
+
     def __get__(self, instance, instance_type=None):
         if instance is None:
             return self
 
         value = instance.__dict__[self.field.name]
 
+        snapshot = None
+        if isinstance(value, (bytes, memoryview)):
+            value = self.field.unpack(value)
         if isinstance(value, str):
-            value = json.loads(value)
+            if instrumentation.active:
+                value, snapshot = instrumentation.call(
+                    instance.__class__, None, "decode", self._decode, value, size=len(value)
+                )
+            else:
+                value, snapshot = self._decode(value)
+            if instance._state.adding:
+                # default value, nothing is stored yet
+                snapshot = None
 
         if isinstance(value, dict) and not isinstance(value, AppDataContainerFactory):
-            value = AppDataContainerFactory(instance, value, app_registry=self.field.app_registry)
+            value = self._build(instance, value, snapshot)
             instance.__dict__[self.field.name] = value
-
-        value._instance = instance
-        value._model = instance.__class__
-        value._app_registry = self.field.app_registry
+        elif value._instance is not instance:
+            # shared with another instance, e.g. by copying it
+            self._bind(value, instance)
         return value
 
     def __set__(self, instance, value):
         if instance is None:
             raise AttributeError("%s must be accessed via instance" % self.field.name)
-        if isinstance(value, dict) and not isinstance(value, AppDataContainerFactory):
-            value = AppDataContainerFactory(instance, value, app_registry=self.field.app_registry)
+        if isinstance(value, (bytes, memoryview)) and not instance._state.adding:
+            value = self.field.unpack(value)
+        if isinstance(value, str) and not instance._state.adding:
+            # assigned by hand to an existing object, we don't know what's in the database
+            value = self._decode(value)[0]
+        if isinstance(value, AppDataContainerFactory):
+            self._bind(value, instance)
+        elif isinstance(value, dict):
+            value = self._build(instance, value)
         instance.__dict__[self.field.name] = value
 
 
-class AppDataField(TextField):
+class AppDataFieldMixin:
+    """Registry, codec and descriptor handling shared by all AppData fields."""
+
+    empty_default = "{}"
+
     def __init__(self, *args, **kwargs):
         self.app_registry = kwargs.pop("app_registry", app_registry)
-        kwargs.setdefault("default", "{}")
+        # split the stored object into per-namespace fragments, decoding each on first access
+        self.lazy = kwargs.pop("lazy", False)
+        self.factory_class = LazyAppDataContainerFactory if self.lazy else AppDataContainerFactory
+        # codec instance, class or dotted path, settings.APP_DATA_CODEC is used when not given
+        self._codec = kwargs.pop("codec", None)
+        # update only the changed namespaces of existing objects using the database's JSON functions
+        self.partial_updates = kwargs.pop("partial_updates", False)
+        kwargs.setdefault("default", self.empty_default)
         kwargs.setdefault("editable", False)
         super().__init__(*args, **kwargs)
 
+    @cached_property
+    def codec(self):
+        return get_codec(self._codec)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.lazy:
+            kwargs["lazy"] = True
+        if self._codec is not None:
+            kwargs["codec"] = self._codec
+        if self.partial_updates:
+            kwargs["partial_updates"] = True
+        return name, path, args, kwargs
+
     def contribute_to_class(self, cls, name, **kwargs):
         super().contribute_to_class(cls, name, **kwargs)
         setattr(cls, name, AppDataDescriptor(self))
 
+    def pre_save(self, model_instance, add):
+        value = super().pre_save(model_instance, add)
+        if self.partial_updates and not add and isinstance(value, AppDataContainerFactory):
+            patch = value._get_patch()
+            if patch is not None:
+                return PatchNamespaces(self, value, *patch)
+        return value
+
+    def get_transform(self, name):
+        transform = super().get_transform(name)
+        if transform is not None and not isinstance(transform, KeyTransformFactory):
+            return transform
+        # any other name is a namespace in app_data
+        return NamespaceTransformFactory(name, self.app_registry.get_class(name, self.model))
+
+    def validate(self, value, model_instance):
+        super().validate(value, model_instance)
+        value.validate(model_instance)
+
+    def decode_stored(self, value):
+        """Return data of a value loaded from the database, without wrapping them in containers."""
+        return self.codec.loads(value) if isinstance(value, str) else dict(value)
+
+    def _encode(self, data, model=None):
+        if not instrumentation.active:
+            return self.codec.dumps_namespaces(data)
+        start = perf_counter()
+        value = self.codec.dumps_namespaces(data)
+        instrumentation.record(
+            model or getattr(self, "model", None), None, "encode", perf_counter() - start, len(value)
+        )
+        return value
+
+    def _to_json(self, value):
+        """Return data as plain JSON compatible objects."""
+        if isinstance(value, AppDataContainerFactory):
+            value = value.serialize()
+        if isinstance(value, dict):
+            value = {k: v.decode(self.codec.loads) if isinstance(v, RawJSON) else v for k, v in value.items()}
+        return value
+
+    def value_to_json(self, obj):
+        """Return data of obj as nested objects for the serializers of app_data.json_serializer and alike."""
+        return self._to_json(self.value_from_object(obj))
+
+    def value_to_string(self, obj):
+        value = self._to_json(self.value_from_object(obj))
+        return self.codec.dumps_namespaces(value) if isinstance(value, dict) else value
+
+
+class AppDataField(AppDataFieldMixin, TextField):
     def get_db_prep_value(self, value, connection, prepared=False):
         """Convert JSON object to a string"""
         if isinstance(value, AppDataContainerFactory):
-            value = value.serialize()
+            value._written = self._encode(value._serialize(), value._model)
+            return value._written
         if isinstance(value, dict):
-            value = json.dumps(value)
+            value = self._encode(value)
+        return value
+
+    def to_python(self, value):
+        # nested data as written by app_data.json_serializer or the encoded text
+        if isinstance(value, dict):
+            return value
+        return super().to_python(value)
+
+
+class AppDataJSONField(AppDataFieldMixin, JSONField):
+    """
+    AppDataField stored in a native JSON column (jsonb on PostgreSQL, JSON1
+    on SQLite) so that the database can inspect and index the data.
+    """
+
+    empty_default = dict
+
+    def from_db_value(self, value, expression, connection):
+        # leave decoding of the whole column to the descriptor so that lazy
+        # mode and codecs work the same as for AppDataField
+        if isinstance(value, str) and isinstance(expression, Col):
+            return value
+        return super().from_db_value(value, expression, connection)
+
+    def get_prep_value(self, value):
+        return super().get_prep_value(self._to_json(value))
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not instrumentation.active:
+            return super().get_db_prep_value(value, connection, prepared)
+        start = perf_counter()
+        value = super().get_db_prep_value(value, connection, prepared)
+        size = len(value) if isinstance(value, str) else 0
+        instrumentation.record(getattr(self, "model", None), None, "encode", perf_counter() - start, size)
         return value
 
     def validate(self, value, model_instance):
-        super().validate(value, model_instance)
         value.validate(model_instance)
+        super(AppDataFieldMixin, self).validate(self._to_json(value), model_instance)
 
     def value_to_string(self, obj):
-        value = self.value_from_object(obj)
+        # like JSONField's, the serializers (XML included) handle nested data of JSON columns
+        return self.value_to_json(obj)
+
+
+# first byte of values stored by CompressedAppDataField, format in the low and its version in the high 4 bits
+FORMAT_JSON = 0x01
+FORMAT_ZLIB = 0x02
+FORMAT_VERSION = 1
+
+
+class CompressedAppDataField(AppDataFieldMixin, BinaryField):
+    """
+    AppDataField stored in a binary column as UTF-8 encoded JSON, compressed
+    by zlib when it's at least ``compress_threshold`` bytes long. The stored
+    value starts with a header byte identifying the format. Values without
+    the header (e.g. text stored by an ``AppDataField`` converted to this
+    field) are read as plain JSON.
+    """
+
+    empty_default = b"{}"
+
+    def __init__(self, *args, **kwargs):
+        self.compress_threshold = kwargs.pop("compress_threshold", 1024)
+        self.compress_level = kwargs.pop("compress_level", -1)
+        super().__init__(*args, **kwargs)
+        if self.partial_updates:
+            raise ValueError("CompressedAppDataField can't be updated partially.")
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.compress_threshold != 1024:
+            kwargs["compress_threshold"] = self.compress_threshold
+        if self.compress_level != -1:
+            kwargs["compress_level"] = self.compress_level
+        return name, path, args, kwargs
+
+    def get_transform(self, name):
+        # the database can't look into the stored data
+        return super(AppDataFieldMixin, self).get_transform(name)
+
+    def pack(self, text):
+        """Return JSON text encoded for storage."""
+        data = text.encode("utf-8")
+        if len(data) >= self.compress_threshold:
+            return bytes([FORMAT_VERSION << 4 | FORMAT_ZLIB]) + zlib.compress(data, self.compress_level)
+        return bytes([FORMAT_VERSION << 4 | FORMAT_JSON]) + data
 
+    def unpack(self, value):
+        """Return JSON text of a stored value."""
+        value = bytes(value)
+        if not value or value[:1] == b"{":
+            # plain JSON without a header
+            return value.decode("utf-8")
+        header = value[0]
+        format, version = header & 0x0F, header >> 4
+        if version != FORMAT_VERSION or format not in (FORMAT_JSON, FORMAT_ZLIB):
+            raise ValueError(f"Unknown format of stored AppData: {header:#04x}.")
+        data = zlib.decompress(value[1:]) if format == FORMAT_ZLIB else value[1:]
+        return data.decode("utf-8")
+
+    def decode_stored(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            value = self.unpack(value)
+        return super().decode_stored(value)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
         if isinstance(value, AppDataContainerFactory):
-            value = value.serialize()
-        if isinstance(value, dict):
-            value = json.dumps(value)
+            value._written = self._encode(value._serialize(), value._model)
+            value = value._written
+        elif isinstance(value, dict):
+            value = self._encode(value)
+        if isinstance(value, str):
+            value = self.pack(value)
+        return super().get_db_prep_value(value, connection, prepared)
+
+    def to_python(self, value):
+        # nested data as written by app_data.json_serializer or the encoded text
+        if isinstance(value, dict) or isinstance(value, str) and value.startswith("{"):
+            return value
+        return super().to_python(value)
+
+
+AppDataField.register_lookup(HasNamespace)
+AppDataJSONField.register_lookup(HasNamespace)
+
+
+def reset_codecs(setting, **kwargs):
+    """Drop codecs of AppData fields resolved from ``settings.APP_DATA_CODEC`` when it changes."""
+    if setting == "APP_DATA_CODEC" and apps.models_ready:
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if isinstance(field, AppDataFieldMixin):
+                    field.__dict__.pop("codec", None)
+
 
-        return smart_str(value)
+setting_changed.connect(reset_codecs, dispatch_uid="app_data_reset_codecs")
 
 
 class ListModelMultipleChoiceField(forms.ModelMultipleChoiceField):
@@ -1,10 +1,18 @@
-from copy import deepcopy
+from copy import copy, deepcopy
 from operator import methodcaller
 
+from django.forms.fields import ChoiceField, Field
 from django.forms.forms import NON_FIELD_ERRORS, Form
 from django.forms.formsets import formset_factory
-from django.forms.models import BaseInlineFormSet, BaseModelFormSet, _get_foreign_key, modelform_factory
+from django.forms.models import (
+    BaseInlineFormSet,
+    BaseModelFormSet,
+    ModelChoiceField,
+    _get_foreign_key,
+    modelform_factory,
+)
 from django.forms.utils import pretty_name
+from django.forms.widgets import ChoiceWidget, Widget
 from django.utils.safestring import mark_safe
 
 
@@ -29,33 +37,43 @@ class AppDataForm(Form):
 
 
 class BaseFieldsDescriptor:
-    """Combines the base_fields and prefixes them properly. Descriptor because needed on class level."""
+    """
+    Combines the base_fields and prefixes them properly. Descriptor because needed on class level.
+    The result is cached per class until the registry or app form options change.
+    """
 
     def __get__(self, instance, owner):
-        if not hasattr(self, "_base_fields"):
-            self._base_fields = bf = {}
-
-            # construct an empty model to get to the data container and thus to the form classes
-            app_container = getattr(owner.ModelForm._meta.model(), owner.app_data_field)
-
-            # all the fields form model_form
-            bf.update(owner.ModelForm.base_fields)
-
-            # go through all the app forms...
-            for label, opts in owner.get_app_form_opts().items():
-                Form = app_container[label].form_class  # noqa: N806
-                exclude = set(opts.get("exclude", ()))
-                fields = opts.get("fields", None)
-                for name, field in Form.base_fields.items():
-                    # skip proper fields
-                    if fields is not None and name not in fields:
-                        continue
-                    if name in exclude:
-                        continue
-                    # prefix the fields
-                    bf["{}.{}".format(label, name)] = field
-
-        return self._base_fields
+        model = owner.ModelForm._meta.model
+        registry = model._meta.get_field(owner.app_data_field).app_registry
+        version = (MultiForm._app_form_opts_version, registry.version)
+
+        cached = owner.__dict__.get("_base_fields_cache")
+        if cached is None or cached[0] != version:
+            cached = (version, self._get_base_fields(owner, model, registry))
+            owner._base_fields_cache = cached
+        return cached[1]
+
+    def _get_base_fields(self, owner, model, registry):
+        # all the fields form model_form
+        bf = dict(owner.ModelForm.base_fields)
+
+        # go through all the app forms...
+        for label, opts in owner.get_app_form_opts().items():
+            container_class = registry.get_class(label, model)
+            if container_class is None:
+                raise KeyError(label)
+            Form = container_class.form_class
+            exclude = set(opts.get("exclude", ()))
+            fields = opts.get("fields", None)
+            for name, field in Form.base_fields.items():
+                # skip proper fields
+                if fields is not None and name not in fields:
+                    continue
+                if name in exclude:
+                    continue
+                # prefix the fields
+                bf[f"{label}.{name}"] = field
+        return bf
 
 
 class AppFormOptsDescriptor:
@@ -77,6 +95,8 @@ class MultiFormMetaclass(type):
 class MultiForm(metaclass=MultiFormMetaclass):
     app_data_field = "app_data"
     app_form_opts = AppFormOptsDescriptor()
+    # bumped by add_form and remove_form to invalidate cached get_app_form_opts results
+    _app_form_opts_version = 0
 
     def __init__(self, *args, **kwargs):
         # construct the main model form
@@ -102,7 +122,19 @@ class MultiForm(metaclass=MultiFormMetaclass):
 
     @classmethod
     def get_app_form_opts(cls):
-        """Utility method to combine app_form_opts from all base classes."""
+        """
+        Utility method to combine app_form_opts from all base classes.
+        The result is cached per class until add_form or remove_form is called
+        on any MultiForm.
+        """
+        cached = cls.__dict__.get("_app_form_opts_cache")
+        if cached is None or cached[0] != MultiForm._app_form_opts_version:
+            cached = (MultiForm._app_form_opts_version, cls._combine_app_form_opts())
+            cls._app_form_opts_cache = cached
+        return cached[1].copy()
+
+    @classmethod
+    def _combine_app_form_opts(cls):
         # subclass may wish to remove superclass's app_form
         skip_labels = set()
 
@@ -131,6 +163,7 @@ class MultiForm(metaclass=MultiFormMetaclass):
         """Add an app_data form to the multi form after its creation."""
         form_options = form_options or {}
         cls.app_form_opts[label] = form_options.copy()
+        MultiForm._app_form_opts_version += 1
 
     @classmethod
     def remove_form(cls, label):
@@ -139,6 +172,7 @@ class MultiForm(metaclass=MultiFormMetaclass):
         Even if this form would be specified in a superclass it would be skipped.
         """
         cls.app_form_opts[label] = None
+        MultiForm._app_form_opts_version += 1
 
     # properties delegated to model_form
     @property
@@ -262,15 +296,51 @@ class MultiForm(metaclass=MultiFormMetaclass):
         return self.model_form.save(**kwargs)
 
 
+# __deepcopy__ implementations copy_field() knows to only copy mutable state of
+COPYABLE_FIELDS = (Field.__deepcopy__, ChoiceField.__deepcopy__, ModelChoiceField.__deepcopy__)
+COPYABLE_WIDGETS = (Widget.__deepcopy__, ChoiceWidget.__deepcopy__)
+
+
+def copy_field(prototype):
+    """
+    Return a copy of form field for use in a single form. Unlike deepcopy the
+    choices are shared with the prototype, only the state forms and widgets
+    modify (widget attrs, error messages, validators, label) is copied.
+    """
+    if (
+        type(prototype).__deepcopy__ not in COPYABLE_FIELDS
+        or type(prototype.widget).__deepcopy__ not in COPYABLE_WIDGETS
+    ):
+        return deepcopy(prototype)
+    field = copy(prototype)
+    field.widget = copy(prototype.widget)
+    field.widget.attrs = prototype.widget.attrs.copy()
+    field.error_messages = prototype.error_messages.copy()
+    field.validators = prototype.validators[:]
+    if isinstance(prototype, ModelChoiceField) and prototype.queryset is not None:
+        # fresh queryset, also binds the widget's choices to the copy
+        field.queryset = prototype.queryset.all()
+    return field
+
+
 class AppDataBaseInlineFormSet(BaseInlineFormSet):
+    def _get_field_prototype(self, name, field):
+        """Return labeled copy of base field shared by all forms of the formset."""
+        prototypes = self.__dict__.setdefault("_field_prototypes", {})
+        base_field, prototype = prototypes.get(name, (None, None))
+        if base_field is not field:
+            prototype = deepcopy(field)
+            if not prototype.label:
+                prototype.label = pretty_name(name.split(".")[1])
+            prototypes[name] = (field, prototype)
+        return prototype
+
     def add_fields(self, form, index):
         """appcontainer fields are no longer added to the empty form, we can inject them hooking here."""
         super().add_fields(form, index)
         for name, field in form.base_fields.items():
             if name not in form.fields:
-                form.fields[name] = deepcopy(field)
-                if not form.fields[name].label:
-                    form.fields[name].label = pretty_name(name.split(".")[1])
+                form.fields[name] = copy_field(self._get_field_prototype(name, field))
 
 
 def multiform_factory(model, multiform=MultiForm, app_data_field="app_data", name=None, form_opts=None, **kwargs):
@@ -0,0 +1,153 @@
+"""
+Opt-in instrumentation of the work done by AppData fields and containers.
+
+Decoding, encoding, cleaning, serialization and validation are timed and
+counted per model and namespace, along with the container fields read::
+
+    from app_data import instrumentation
+
+    with instrumentation.collect() as stats:
+        ...
+    print(stats.as_dict())
+
+``enable()`` starts collecting process wide into ``get_stats()``. When no
+collection is active the hot paths only check the module level ``active``
+counter.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+# number of active collections, checked by the instrumented code
+active = 0
+
+_lock = Lock()
+_global_stats = None
+_scoped_stats = ContextVar("app_data_stats", default=())
+
+
+def model_label(model):
+    if model is None:
+        return None
+    meta = getattr(model, "_meta", None)
+    return meta.label if meta is not None else model.__name__
+
+
+class Stats:
+    """Counts, cumulative time and bytes per model, namespace and operation."""
+
+    def __init__(self):
+        self._lock = Lock()
+        # (model, namespace, operation) -> [count, seconds, bytes]
+        self.operations = {}
+        # (model, namespace, field) -> count
+        self.fields_read = {}
+
+    def record(self, model, namespace, operation, duration, size=0):
+        key = (model_label(model), namespace, operation)
+        with self._lock:
+            counters = self.operations.setdefault(key, [0, 0.0, 0])
+            counters[0] += 1
+            counters[1] += duration
+            counters[2] += size
+
+    def record_read(self, model, namespace, field):
+        key = (model_label(model), namespace, field)
+        with self._lock:
+            self.fields_read[key] = self.fields_read.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.operations = {}
+            self.fields_read = {}
+
+    def as_dict(self):
+        """Return the collected data as a JSON serializable dict."""
+        with self._lock:
+            return {
+                "operations": [
+                    {
+                        "model": model,
+                        "namespace": namespace,
+                        "operation": operation,
+                        "count": count,
+                        "time": duration,
+                        "bytes": size,
+                    }
+                    for (model, namespace, operation), (count, duration, size) in self.operations.items()
+                ],
+                "fields_read": [
+                    {"model": model, "namespace": namespace, "field": field, "count": count}
+                    for (model, namespace, field), count in self.fields_read.items()
+                ],
+            }
+
+
+def _targets():
+    if _global_stats is not None:
+        return (_global_stats, *_scoped_stats.get())
+    return _scoped_stats.get()
+
+
+def _activate(delta):
+    global active
+    with _lock:
+        active += delta
+
+
+def enable():
+    """Start collecting process wide stats, returned by get_stats()."""
+    global _global_stats
+    with _lock:
+        if _global_stats is not None:
+            return
+        _global_stats = Stats()
+    _activate(1)
+
+
+def disable():
+    global _global_stats
+    with _lock:
+        if _global_stats is None:
+            return
+        _global_stats = None
+    _activate(-1)
+
+
+def get_stats():
+    """Return process wide stats, None unless enabled."""
+    return _global_stats
+
+
+@contextmanager
+def collect():
+    """Collect stats of the work done in the current context (thread, task) within the block."""
+    stats = Stats()
+    token = _scoped_stats.set((*_scoped_stats.get(), stats))
+    _activate(1)
+    try:
+        yield stats
+    finally:
+        _activate(-1)
+        _scoped_stats.reset(token)
+
+
+def record(model, namespace, operation, duration, size=0):
+    for stats in _targets():
+        stats.record(model, namespace, operation, duration, size)
+
+
+def record_read(model, namespace, field):
+    for stats in _targets():
+        stats.record_read(model, namespace, field)
+
+
+def call(model, namespace, operation, func, *args, size=0):
+    """Call func(*args) and record how long it took."""
+    start = perf_counter()
+    try:
+        return func(*args)
+    finally:
+        record(model, namespace, operation, perf_counter() - start, size)
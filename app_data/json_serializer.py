@@ -0,0 +1,17 @@
+from django.core.serializers import json
+from django.core.serializers.json import Deserializer  # noqa: F401
+
+from .fields import AppDataFieldMixin
+
+
+class AppDataSerializerMixin:
+    """Write the data of AppData fields as nested objects instead of JSON encoded into a string."""
+
+    def _value_from_field(self, obj, field):
+        if isinstance(field, AppDataFieldMixin):
+            return field.value_to_json(obj)
+        return super()._value_from_field(obj, field)
+
+
+class Serializer(AppDataSerializerMixin, json.Serializer):
+    pass
@@ -0,0 +1,90 @@
+from functools import cache
+
+from django.db.models import JSONField
+from django.db.models.fields.json import HasKey, KeyTransform, KeyTransformFactory
+from django.db.models.functions import Cast
+
+from .containers import serialize_value
+
+# lookups comparing the stored value with the right hand side
+PREPARED_LOOKUPS = {"exact", "lt", "lte", "gt", "gte", "in", "range"}
+
+
+def json_lhs(lhs):
+    """Cast text stored app_data to JSON so that database JSON functions can be used on it."""
+    if isinstance(lhs.output_field, JSONField):
+        return lhs
+    return Cast(lhs, JSONField())
+
+
+class PreparedLookupMixin:
+    """Convert the right hand side using the namespace form field, the same way containers store values."""
+
+    def __init__(self, lhs, rhs):
+        if not hasattr(rhs, "resolve_expression"):
+            if self.lookup_name in ("in", "range"):
+                rhs = [serialize_value(lhs.form_field, v) for v in rhs]
+            else:
+                rhs = serialize_value(lhs.form_field, rhs)
+        super().__init__(lhs, rhs)
+
+
+@cache
+def prepared_lookup(lookup_class):
+    return type(lookup_class.__name__, (PreparedLookupMixin, lookup_class), {})
+
+
+class NamespaceKeyTransform(KeyTransform):
+    """Key of a registered namespace, aware of its form field."""
+
+    def __init__(self, key_name, form_field, *args, **kwargs):
+        super().__init__(key_name, *args, **kwargs)
+        self.form_field = form_field
+
+    def get_lookup(self, name):
+        lookup_class = super().get_lookup(name)
+        if lookup_class is not None and name in PREPARED_LOOKUPS:
+            return prepared_lookup(lookup_class)
+        return lookup_class
+
+
+class NamespaceTransform(KeyTransform):
+    """Top level key of app_data, i.e. a namespace."""
+
+    def __init__(self, namespace, lhs, container_class=None):
+        # plain JSONField as output so that nested keys aren't treated as namespaces
+        super().__init__(namespace, json_lhs(lhs), output_field=JSONField())
+        self.container_class = container_class
+
+    def get_transform(self, name):
+        transform = super().get_transform(name)
+        if isinstance(transform, KeyTransformFactory) and self.container_class is not None:
+            form_field = getattr(self.container_class.form_class, "base_fields", {}).get(name)
+            if form_field is not None:
+                return NamespaceKeyTransformFactory(name, form_field)
+        return transform
+
+
+class NamespaceTransformFactory:
+    def __init__(self, namespace, container_class=None):
+        self.namespace = namespace
+        self.container_class = container_class
+
+    def __call__(self, *args, **kwargs):
+        return NamespaceTransform(self.namespace, *args, container_class=self.container_class, **kwargs)
+
+
+class NamespaceKeyTransformFactory:
+    def __init__(self, key_name, form_field):
+        self.key_name = key_name
+        self.form_field = form_field
+
+    def __call__(self, *args, **kwargs):
+        return NamespaceKeyTransform(self.key_name, self.form_field, *args, **kwargs)
+
+
+class HasNamespace(HasKey):
+    lookup_name = "has_namespace"
+
+    def __init__(self, lhs, rhs):
+        super().__init__(json_lhs(lhs), rhs)
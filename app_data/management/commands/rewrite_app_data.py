@@ -0,0 +1,173 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from app_data.fields import AppDataFieldMixin
+
+
+def get_model_field(label, field_name):
+    try:
+        model = apps.get_model(label)
+    except (LookupError, ValueError) as e:
+        raise CommandError(str(e))
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        field = None
+    if not isinstance(field, AppDataFieldMixin):
+        raise CommandError(f"{label} has no AppData field {field_name!r}.")
+    return model, field
+
+
+def rewrite_chunk(label, field_name, namespaces, first, last, using, chunk_size):
+    """
+    Apply registered upgrades to rows with primary keys between first and
+    last, return the number of rows processed and updated.
+    """
+    model, field = get_model_field(label, field_name)
+    upgrades = field.app_registry.get_upgrades(model)
+    if namespaces:
+        upgrades = {ns: upgrade for ns, upgrade in upgrades.items() if ns in namespaces}
+
+    queryset = (
+        model._base_manager.using(using)
+        .filter(pk__gte=first, pk__lte=last)
+        .order_by("pk")
+        .only(model._meta.pk.attname, field.attname)
+    )
+    processed = 0
+    changed = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        processed += 1
+        data = field.decode_stored(obj.__dict__[field.attname])
+        updated = False
+        for namespace, upgrade in upgrades.items():
+            if namespace in data:
+                new = upgrade(dict(data[namespace]))
+                if new != data[namespace]:
+                    data[namespace] = new
+                    updated = True
+        if updated:
+            setattr(obj, field.attname, data)
+            changed.append(obj)
+
+    if changed:
+        with transaction.atomic(using=using):
+            model._base_manager.using(using).bulk_update(changed, [field.name], batch_size=chunk_size)
+    return processed, len(changed)
+
+
+def init_worker():
+    import django
+
+    django.setup()
+    # connections inherited from the parent process can't be shared
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Apply upgrades registered for AppData namespaces to all rows of a model."
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="app_label.ModelName")
+        parser.add_argument("--field", default="app_data", help="AppData field to rewrite, app_data by default.")
+        parser.add_argument(
+            "--namespace", action="append", dest="namespaces", help="Only upgrade this namespace (repeatable)."
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per chunk.")
+        parser.add_argument("--workers", type=int, default=1, help="Number of processes to rewrite chunks with.")
+        parser.add_argument("--checkpoint", help="File to store progress in and resume from.")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        label, field_name = options["model"], options["field"]
+        model, field = get_model_field(label, field_name)
+        if not field.app_registry.get_upgrades(model):
+            raise CommandError(f"No upgrades registered for {label}.")
+
+        using = options["database"]
+        if options["workers"] > 1 and connections[using].vendor == "sqlite":
+            raise CommandError("SQLite doesn't support concurrent writes, use a single worker.")
+        chunk_size = options["chunk_size"]
+        checkpoint = options["checkpoint"]
+        start = self.read_checkpoint(checkpoint, label, field_name)
+
+        pks = model._base_manager.using(using).order_by("pk").values_list("pk", flat=True)
+        if start is not None:
+            pks = pks.filter(pk__gt=start)
+        total = pks.count()
+        chunks = self.get_chunks(pks, chunk_size)
+
+        rewrite = partial(rewrite_chunk, label, field_name, options["namespaces"], using=using, chunk_size=chunk_size)
+        if options["workers"] > 1:
+            # connections can't be shared with the worker processes
+            connections.close_all()
+            executor = ProcessPoolExecutor(options["workers"], initializer=init_worker)
+            results = executor.map(rewrite, *zip(*chunks))
+        else:
+            executor = None
+            results = (rewrite(first, last) for first, last in chunks)
+
+        processed = updated = finished = 0
+        started = time.monotonic()
+        try:
+            # results come in order so everything up to the current chunk is done
+            for (chunk_processed, chunk_updated), (first, last) in zip(results, chunks):
+                processed += chunk_processed
+                updated += chunk_updated
+                finished += 1
+                self.write_checkpoint(checkpoint, label, field_name, last)
+                elapsed = time.monotonic() - started
+                rate = processed / elapsed if elapsed else 0
+                self.stdout.write(f"{processed}/{total} rows processed, {updated} updated ({rate:.0f} rows/s)")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rewrote {label}.{field_name}: {processed} rows processed, {updated} updated in {finished} chunks."
+            )
+        )
+
+    def get_chunks(self, pks, chunk_size):
+        """Split primary keys into (first, last) ranges of chunk_size rows, streaming them from the database."""
+        chunks = []
+        first = last = None
+        count = 0
+        for pk in pks.iterator(chunk_size=chunk_size):
+            if first is None:
+                first = pk
+            last = pk
+            count += 1
+            if count == chunk_size:
+                chunks.append((first, last))
+                first, count = None, 0
+        if first is not None:
+            chunks.append((first, last))
+        return chunks
+
+    def read_checkpoint(self, path, label, field_name):
+        if not path or not os.path.exists(path):
+            return None
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if (checkpoint.get("model"), checkpoint.get("field")) != (label, field_name):
+            raise CommandError(f"Checkpoint {path} belongs to {checkpoint.get('model')}.{checkpoint.get('field')}.")
+        self.stdout.write(f"Resuming after primary key {checkpoint['last_pk']!r}.")
+        return checkpoint["last_pk"]
+
+    def write_checkpoint(self, path, label, field_name, last_pk):
+        if not path:
+            return
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"model": label, "field": field_name, "last_pk": last_pk}, f, default=str)
+        os.replace(tmp, path)
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExternalAppData",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("object_id", models.CharField(max_length=255)),
+                ("namespace", models.CharField(max_length=255)),
+                ("data", models.TextField()),
+                (
+                    "content_type",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="contenttypes.contenttype"),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="externalappdata",
+            constraint=models.UniqueConstraint(
+                fields=("content_type", "object_id", "namespace"), name="app_data_external_unique_namespace"
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+from django.db import models
+
+from .containers import AppDataContainerFactory
+from .fields import AppDataFieldMixin
+
+
+def get_app_data_fields(model):
+    return [f for f in model._meta.concrete_fields if isinstance(f, AppDataFieldMixin)]
+
+
+def app_data_changed(instance, field):
+    """Return a boolean indicating whether field's data differ from the ones stored in the database."""
+    value = instance.__dict__.get(field.attname)
+    if isinstance(value, AppDataContainerFactory):
+        return value.has_changed()
+    # still the raw value loaded from the database, bytes for CompressedAppDataField (or deferred)
+    return not isinstance(value, (str, bytes, memoryview)) and field.attname not in instance.get_deferred_fields()
+
+
+def get_update_fields(instance):
+    """
+    Return names of the fields that ``instance.save()`` needs to write,
+    leaving out AppData fields whose data haven't changed. Returns ``None``
+    if nothing can be left out.
+    """
+    unchanged = {f.attname for f in get_app_data_fields(type(instance)) if not app_data_changed(instance, f)}
+    if not unchanged:
+        return None
+    deferred = instance.get_deferred_fields()
+    return [
+        f.attname
+        for f in instance._meta.concrete_fields
+        if not f.primary_key and f.attname not in unchanged and f.attname not in deferred
+    ]
+
+
+class AppDataModelMixin:
+    """Model mixin leaving AppData fields with unchanged data out of the UPDATE on save()."""
+
+    def save(self, *args, **kwargs):
+        if not args and not self._state.adding and not kwargs.get("force_insert") and not kwargs.get("update_fields"):
+            update_fields = get_update_fields(self)
+            # with nothing else to save do a regular save so that it still happens
+            if update_fields:
+                kwargs["update_fields"] = update_fields
+
+        super().save(*args, **kwargs)
+
+        written = kwargs.get("update_fields")
+        for field in get_app_data_fields(type(self)):
+            value = self.__dict__.get(field.attname)
+            if isinstance(value, AppDataContainerFactory) and (
+                written is None or field.attname in written or field.name in written
+            ):
+                value._mark_saved()
+
+
+class ExternalAppData(models.Model):
+    """Data of a namespace registered as external, encoded by the AppData field's codec."""
+
+    content_type = models.ForeignKey("contenttypes.ContentType", on_delete=models.CASCADE)
+    object_id = models.CharField(max_length=255)
+    namespace = models.CharField(max_length=255)
+    data = models.TextField()
+
+    class Meta:
+        app_label = "app_data"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id", "namespace"], name="app_data_external_unique_namespace"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.content_type} {self.object_id}: {self.namespace}"
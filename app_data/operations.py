@@ -0,0 +1,230 @@
+from django.db.migrations.operations.base import Operation
+from django.db.models import Case, Value, When
+from django.db.models.sql import UpdateQuery
+
+from .expressions import HasJSONPath, MoveJSONPath, PatchNamespaces, supports_json_edits
+from .fields import CompressedAppDataField
+
+
+class AppDataOperation(Operation):
+    """
+    Base class of migration operations rewriting the data stored in an
+    AppData field. On databases with JSON functions (PostgreSQL, MySQL and
+    SQLite) the operation is a single UPDATE of the rows it applies to,
+    elsewhere, and for ``CompressedAppDataField`` which the database can't
+    look into, the rows are decoded and rewritten in Python, ``chunk_size``
+    rows at a time.
+
+    Subclasses implement ``get_expressions(field)`` returning the condition
+    and the expression of the UPDATE and ``rewrite_data(data)`` changing the
+    decoded data in place and returning a boolean indicating whether there
+    was anything to change.
+    """
+
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, model_name, field_name="app_data", chunk_size=1000):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.chunk_size = chunk_size
+
+    @property
+    def model_name_lower(self):
+        return self.model_name.lower()
+
+    def _deconstruct(self, *args, **kwargs):
+        if self.field_name != "app_data":
+            kwargs["field_name"] = self.field_name
+        if self.chunk_size != 1000:
+            kwargs["chunk_size"] = self.chunk_size
+        return (self.__class__.__qualname__, [self.model_name, *args], kwargs)
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self.rewrite(app_label, schema_editor, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self.reverse().rewrite(app_label, schema_editor, to_state)
+
+    def references_model(self, name, app_label):
+        return name.lower() == self.model_name_lower
+
+    def reverse(self):
+        """Return the operation undoing this one."""
+        raise NotImplementedError("subclasses of AppDataOperation must provide a reverse() method")
+
+    def get_expressions(self, field):
+        raise NotImplementedError("subclasses of AppDataOperation must provide a get_expressions() method")
+
+    def rewrite_data(self, data):
+        raise NotImplementedError("subclasses of AppDataOperation must provide a rewrite_data() method")
+
+    def rewrite(self, app_label, schema_editor, state):
+        model = state.apps.get_model(app_label, self.model_name)
+        alias = schema_editor.connection.alias
+        if not self.allow_migrate_model(alias, model):
+            return
+
+        field = model._meta.get_field(self.field_name)
+        # rows of the model the field is defined on, not through multi-table inheritance children
+        queryset = field.model._base_manager.using(alias)
+
+        if not isinstance(field, CompressedAppDataField) and supports_json_edits(schema_editor.connection):
+            condition, expression = self.get_expressions(field)
+            query = queryset.filter(condition).query.chain(UpdateQuery)
+            query.add_update_values({field.name: expression})
+            schema_editor.execute(*query.get_compiler(alias).as_sql())
+        elif schema_editor.collect_sql:
+            schema_editor.collected_sql.append("-- THIS OPERATION IS DONE IN PYTHON FOR THIS FIELD AND DATABASE")
+        else:
+            self.rewrite_python(queryset, field)
+
+    def rewrite_python(self, queryset, field):
+        pk = queryset.model._meta.pk.attname
+        queryset = queryset.order_by(pk).values_list(pk, field.attname)
+        last = None
+        while True:
+            chunk = queryset if last is None else queryset.filter(pk__gt=last)
+            rows = list(chunk[: self.chunk_size])
+            if not rows:
+                return
+            changed = {}
+            for pk_value, value in rows:
+                data = field.decode_stored(value) if isinstance(value, (str, bytes, memoryview)) else value
+                if isinstance(data, dict) and self.rewrite_data(data):
+                    changed[pk_value] = data
+            if changed:
+                whens = [When(pk=pk_value, then=Value(data, output_field=field)) for pk_value, data in changed.items()]
+                queryset.filter(pk__in=changed).update(**{field.attname: Case(*whens, output_field=field)})
+            last = rows[-1][0]
+
+
+class RenameAppDataNamespace(AppDataOperation):
+    """Rename namespace ``old_name`` to ``new_name``, replacing the data of ``new_name`` if there are any."""
+
+    def __init__(self, model_name, old_name, new_name, **kwargs):
+        super().__init__(model_name, **kwargs)
+        self.old_name = old_name
+        self.new_name = new_name
+
+    def deconstruct(self):
+        return self._deconstruct(self.old_name, self.new_name)
+
+    def reverse(self):
+        return self.__class__(
+            self.model_name, self.new_name, self.old_name, field_name=self.field_name, chunk_size=self.chunk_size
+        )
+
+    def get_expressions(self, field):
+        return HasJSONPath(field, self.old_name), MoveJSONPath(field, [self.old_name], [self.new_name])
+
+    def rewrite_data(self, data):
+        if self.old_name not in data:
+            return False
+        data[self.new_name] = data.pop(self.old_name)
+        return True
+
+    def describe(self):
+        return f"Rename AppData namespace {self.old_name} to {self.new_name} on {self.model_name}.{self.field_name}"
+
+    @property
+    def migration_name_fragment(self):
+        return f"rename_{self.model_name_lower}_{self.old_name}_{self.new_name}"
+
+
+class MoveAppDataKey(AppDataOperation):
+    """
+    Move ``key`` of namespace ``from_namespace`` to namespace
+    ``to_namespace``, optionally renaming it to ``new_key``. Both namespaces
+    may be the same to just rename the key.
+    """
+
+    def __init__(self, model_name, key, from_namespace, to_namespace, new_key=None, **kwargs):
+        super().__init__(model_name, **kwargs)
+        self.key = key
+        self.from_namespace = from_namespace
+        self.to_namespace = to_namespace
+        self.new_key = new_key
+        if (from_namespace, key) == (to_namespace, self.target_key):
+            raise ValueError(f"MoveAppDataKey needs a different namespace or key to move {key!r} to.")
+
+    @property
+    def target_key(self):
+        return self.key if self.new_key is None else self.new_key
+
+    def deconstruct(self):
+        name, args, kwargs = self._deconstruct(self.key, self.from_namespace, self.to_namespace)
+        if self.new_key is not None:
+            kwargs["new_key"] = self.new_key
+        return name, args, kwargs
+
+    def reverse(self):
+        return self.__class__(
+            self.model_name,
+            self.target_key,
+            self.to_namespace,
+            self.from_namespace,
+            new_key=None if self.new_key is None else self.key,
+            field_name=self.field_name,
+            chunk_size=self.chunk_size,
+        )
+
+    def get_expressions(self, field):
+        return (
+            HasJSONPath(field, self.from_namespace, self.key),
+            MoveJSONPath(field, [self.from_namespace, self.key], [self.to_namespace, self.target_key]),
+        )
+
+    def rewrite_data(self, data):
+        source = data.get(self.from_namespace)
+        if not isinstance(source, dict) or self.key not in source:
+            return False
+        value = source.pop(self.key)
+        data.setdefault(self.to_namespace, {})[self.target_key] = value
+        return True
+
+    def describe(self):
+        return (
+            f"Move AppData key {self.from_namespace}.{self.key} to {self.to_namespace}.{self.target_key}"
+            f" on {self.model_name}.{self.field_name}"
+        )
+
+    @property
+    def migration_name_fragment(self):
+        return f"move_{self.model_name_lower}_{self.from_namespace}_{self.key}"
+
+
+class RemoveAppDataNamespace(AppDataOperation):
+    """
+    Remove the data of namespace ``namespace``. Reversing the operation does
+    nothing, the data are gone.
+    """
+
+    def __init__(self, model_name, namespace, **kwargs):
+        super().__init__(model_name, **kwargs)
+        self.namespace = namespace
+
+    def deconstruct(self):
+        return self._deconstruct(self.namespace)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
+
+    def get_expressions(self, field):
+        return HasJSONPath(field, self.namespace), PatchNamespaces(field, None, {}, [self.namespace])
+
+    def rewrite_data(self, data):
+        if self.namespace not in data:
+            return False
+        del data[self.namespace]
+        return True
+
+    def describe(self):
+        return f"Remove AppData namespace {self.namespace} from {self.model_name}.{self.field_name}"
+
+    @property
+    def migration_name_fragment(self):
+        return f"remove_{self.model_name_lower}_{self.namespace}"
@@ -0,0 +1,275 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldError, ValidationError
+from django.db.models import F, Manager, QuerySet
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.query import BaseIterable, ValuesListIterable
+from django.forms import ModelChoiceField, ModelMultipleChoiceField
+
+from .fields import AppDataFieldMixin, ListModelMultipleChoiceField
+
+
+def resolve_path(model, path, min_keys=2):
+    """
+    Split dotted path into the AppData field and the keys in it. Paths start
+    with the field name unless the model has just one AppData field.
+    """
+    fields = {f.name: f for f in model._meta.concrete_fields if isinstance(f, AppDataFieldMixin)}
+    parts = path.split(".")
+    if len(fields) == 1:
+        (field,) = fields.values()
+    elif parts[0] in fields:
+        field = fields[parts.pop(0)]
+    else:
+        raise FieldError(f"Cannot resolve {path!r} into an AppData field of {model.__name__}.")
+    if len(parts) < min_keys:
+        raise FieldError(f"{path!r} is not a namespace.key path.")
+    return field, parts
+
+
+def get_form_field(field, model, namespace, name):
+    """Return form field for name in namespace, None if there isn't one."""
+    container_class = field.app_registry.get_class(namespace, model)
+    if container_class is None:
+        return None
+    codecs = container_class.get_field_codecs()
+    if codecs is not None:
+        return codecs[name].field if name in codecs else None
+    return container_class.form_class.base_fields.get(name)
+
+
+def _get_model_keys(containers, name, form_field):
+    """Return ``(container, key or keys)`` pairs of references not resolved yet along with all the keys."""
+    to_field = form_field.to_field_name or form_field.queryset.model._meta.pk.name
+    key_field = form_field.queryset.model._meta.get_field(to_field)
+    multiple = isinstance(form_field, ModelMultipleChoiceField)
+
+    pending = []
+    keys = set()
+    for container in containers:
+        if name in container._attr_cache:
+            continue
+        value = container._data.get(name)
+        if value in form_field.empty_values or multiple and not isinstance(value, (list, tuple)):
+            # cleaned without a query or invalid
+            continue
+        try:
+            value = [key_field.to_python(v) for v in value] if multiple else key_field.to_python(value)
+        except (ValidationError, TypeError):
+            # leave it to the form field to report
+            continue
+        pending.append((container, value))
+        keys.update(value if multiple else [value])
+    return pending, keys
+
+
+def _set_model_objects(pending, objects, name, form_field):
+    to_field = form_field.to_field_name or form_field.queryset.model._meta.pk.name
+    for container, value in pending:
+        if not isinstance(form_field, ModelMultipleChoiceField):
+            if value in objects:
+                container._attr_cache[name] = objects[value]
+            continue
+        if not all(v in objects for v in value):
+            # invalid choice, leave it to the form field
+            continue
+        value = [objects[v] for v in value]
+        if not isinstance(form_field, ListModelMultipleChoiceField):
+            queryset = form_field.queryset.filter(**{f"{to_field}__in": [getattr(o, to_field) for o in value]})
+            queryset._result_cache = value
+            queryset._prefetch_done = True
+            value = queryset
+        container._attr_cache[name] = value
+
+
+def prefetch_model_field(containers, name, form_field):
+    """Resolve references of the model choice field ``name`` of all the containers with a single query."""
+    pending, keys = _get_model_keys(containers, name, form_field)
+    if pending:
+        to_field = form_field.to_field_name or form_field.queryset.model._meta.pk.name
+        _set_model_objects(pending, form_field.queryset.in_bulk(keys, field_name=to_field), name, form_field)
+
+
+async def aprefetch_model_field(containers, name, form_field):
+    """Async counterpart of ``prefetch_model_field`` using the async ORM."""
+    pending, keys = _get_model_keys(containers, name, form_field)
+    if pending:
+        to_field = form_field.to_field_name or form_field.queryset.model._meta.pk.name
+        queryset = form_field.queryset
+        if hasattr(queryset, "ain_bulk"):
+            objects = await queryset.ain_bulk(keys, field_name=to_field)
+        else:
+            # no async ORM before Django 4.1
+            objects = await sync_to_async(queryset.in_bulk)(keys, field_name=to_field)
+        _set_model_objects(pending, objects, name, form_field)
+
+
+def _get_prefetches(instances, lookups):
+    """
+    Yield ``(instances, field, external, namespace, name, form_field)`` for
+    each of the lookups and models of the instances, ``name`` and
+    ``form_field`` are ``None`` for bare external namespaces.
+    """
+    by_model = {}
+    for instance in instances:
+        by_model.setdefault(type(instance), []).append(instance)
+
+    for model, model_instances in by_model.items():
+        for lookup in lookups:
+            field, parts = resolve_path(model, lookup, min_keys=1)
+            external = parts[0] in field.app_registry.get_external_namespaces(model)
+            if len(parts) == 1:
+                if not external:
+                    raise FieldError(f"{lookup!r} is not an external namespace.")
+                yield model_instances, field, external, parts[0], None, None
+                continue
+            if len(parts) != 2:
+                raise FieldError(f"{lookup!r} is not a namespace.name path.")
+            namespace, name = parts
+            form_field = get_form_field(field, model, namespace, name)
+            if not isinstance(form_field, ModelChoiceField):
+                raise FieldError(f"{lookup!r} is not a model choice field of a registered namespace.")
+            yield model_instances, field, external, namespace, name, form_field
+
+
+def prefetch_app_data(instances, *lookups):
+    """
+    Load model instances referenced by the ``ModelChoiceField`` or
+    ``ModelMultipleChoiceField`` given by ``namespace.name`` lookups for all
+    the instances at once, one ``in_bulk`` query per lookup, and use them as
+    the cleaned values of the containers.
+
+    External namespaces, given by ``namespace`` lookups or as part of
+    ``namespace.name`` ones, are loaded for all the instances at once too.
+    """
+    for model_instances, field, external, namespace, name, form_field in _get_prefetches(instances, lookups):
+        if external:
+            from .external import prefetch_external
+
+            prefetch_external(model_instances, field, namespace)
+        if name is not None:
+            containers = [getattr(instance, field.attname)[namespace] for instance in model_instances]
+            prefetch_model_field(containers, name, form_field)
+
+
+async def aprefetch_app_data(instances, *lookups):
+    """Async counterpart of ``prefetch_app_data`` using the async ORM."""
+    for model_instances, field, external, namespace, name, form_field in _get_prefetches(instances, lookups):
+        if external:
+            from .external import aprefetch_external
+
+            await aprefetch_external(model_instances, field, namespace)
+        if name is not None:
+            containers = [getattr(instance, field.attname)[namespace] for instance in model_instances]
+            await aprefetch_model_field(containers, name, form_field)
+
+
+class AppDataValuesIterable(BaseIterable):
+    """Yield values of AppData paths selected by values_app_data() as tuples, dicts or single values."""
+
+    def __iter__(self):
+        paths, converters, as_dict, flat = self.queryset._app_data_values
+        for row in ValuesListIterable(self.queryset, chunked_fetch=self.chunked_fetch, chunk_size=self.chunk_size):
+            row = tuple(value if convert is None else convert(value) for convert, value in zip(converters, row))
+            if flat:
+                yield row[0]
+            elif as_dict:
+                yield dict(zip(paths, row))
+            else:
+                yield row
+
+
+class AppDataQuerySet(QuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prefetch_app_data_lookups = ()
+        self._prefetch_app_data_done = False
+        self._app_data_values = None
+
+    def _clone(self):
+        c = super()._clone()
+        c._prefetch_app_data_lookups = self._prefetch_app_data_lookups
+        c._app_data_values = self._app_data_values
+        return c
+
+    def _fetch_all(self):
+        super()._fetch_all()
+        if self._prefetch_app_data_lookups and not self._prefetch_app_data_done:
+            if self._fields is None:
+                prefetch_app_data(self._result_cache, *self._prefetch_app_data_lookups)
+            self._prefetch_app_data_done = True
+
+    def _iterator(self, use_chunked_fetch, chunk_size):
+        iterator = super()._iterator(use_chunked_fetch, chunk_size)
+        if not self._prefetch_app_data_lookups or self._fields is not None:
+            yield from iterator
+            return
+        # like prefetch_related(), prefetch for each chunk of objects
+        while True:
+            results = list(islice(iterator, chunk_size or 2000))
+            if not results:
+                return
+            prefetch_app_data(results, *self._prefetch_app_data_lookups)
+            yield from results
+
+    if hasattr(QuerySet, "aiterator"):  # no async ORM before Django 4.1
+
+        async def aiterator(self, chunk_size=2000):
+            if not self._prefetch_app_data_lookups or self._fields is not None:
+                async for obj in super().aiterator(chunk_size):
+                    yield obj
+                return
+            results = []
+            async for obj in super().aiterator(chunk_size):
+                results.append(obj)
+                if len(results) == chunk_size:
+                    await aprefetch_app_data(results, *self._prefetch_app_data_lookups)
+                    for result in results:
+                        yield result
+                    results = []
+            if results:
+                await aprefetch_app_data(results, *self._prefetch_app_data_lookups)
+                for result in results:
+                    yield result
+
+    def prefetch_app_data(self, *lookups):
+        """
+        Return a new QuerySet that resolves model references stored under the
+        ``namespace.name`` lookups and loads external namespaces given by
+        ``namespace`` lookups for all its objects in a single query each.
+        Passing ``None`` clears the list.
+        """
+        clone = self._chain()
+        if lookups == (None,):
+            clone._prefetch_app_data_lookups = ()
+        else:
+            clone._prefetch_app_data_lookups = clone._prefetch_app_data_lookups + lookups
+        return clone
+
+    def values_app_data(self, *paths, as_dict=False, flat=False, to_python=False):
+        """
+        Return a QuerySet yielding tuples (dicts with ``as_dict``, single
+        values with ``flat``) of values under the given dotted paths, extracted
+        by the database's JSON functions. With ``to_python`` values of
+        registered namespaces' fields are converted by the form field's
+        ``to_python``.
+        """
+        if flat and (as_dict or len(paths) != 1):
+            raise TypeError("'flat' is valid only with a single path and without 'as_dict'.")
+
+        annotations = {}
+        converters = []
+        for i, path in enumerate(paths):
+            field, parts = resolve_path(self.model, path)
+            annotations[f"_app_data_{i}"] = F(LOOKUP_SEP.join([field.name, *parts]))
+            form_field = get_form_field(field, self.model, *parts) if to_python and len(parts) == 2 else None
+            converters.append(form_field.to_python if form_field is not None else None)
+
+        clone = self.annotate(**annotations).values_list(*annotations)
+        clone._iterable_class = AppDataValuesIterable
+        clone._app_data_values = (paths, converters, as_dict, flat)
+        return clone
+
+
+AppDataManager = Manager.from_queryset(AppDataQuerySet)
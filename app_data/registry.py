@@ -1,3 +1,9 @@
+from types import MappingProxyType
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+
+
 class NamespaceConflict(Exception):  # noqa: N818
     pass
 
@@ -6,6 +12,10 @@ class NamespaceMissing(KeyError):
     pass
 
 
+class RegistryFrozen(Exception):
+    pass
+
+
 class NamespaceRegistry:
     """
     Global registry of app_specific storage classes in app_data field
@@ -13,31 +23,65 @@ class NamespaceRegistry:
 
     def __init__(self, default_class=None):
         self.default_class = default_class
+        # incremented whenever resolved namespaces may change
+        self.version = 0
         self._reset()
 
     def _reset(self):
         # stuff registered by apps
         self._global_registry = {}
         self._model_registry = {}
+        # {model or None: {namespace}} of namespaces stored in the ExternalAppData table
+        self._external = {}
+        # {model or None: {namespace: callable}} used by the rewrite_app_data command
+        self._upgrades = {}
+        self._frozen = None
+        self._invalidate()
 
-    def get_class(self, namespace, model):
-        """
-        Get class for namespace in given model
-        """
+    def _invalidate(self):
+        """Drop all resolved (model, namespace) lookups."""
+        self._resolved = {}
+        self._resolved_external = {}
+        self.version += 1
 
+    def _resolve(self, namespace, model):
         # go through the MRO looking for registered namespace to our model or it's parents
         for c in model.mro():
             if c in self._model_registry and namespace in self._model_registry[c]:
                 return self._model_registry[c][namespace]
 
         # no namespace found for model or it's parents, try the global registry
-        if namespace in self._global_registry:
-            return self._global_registry[namespace]
+        return self._global_registry.get(namespace)
+
+    def get_class(self, namespace, model):
+        """
+        Get class for namespace in given model
+        """
+        if self._frozen is not None:
+            table = self._frozen.get(model)
+            class_ = self._resolve(namespace, model) if table is None else table.get(namespace)
+        else:
+            key = (model, namespace)
+            try:
+                class_ = self._resolved[key]
+            except KeyError:
+                class_ = self._resolved[key] = self._resolve(namespace, model)
 
         # fallback to default
-        return self.default_class
+        return self.default_class if class_ is None else class_
 
-    def register(self, namespace, class_, model=None, override=False):
+    def register(self, namespace, class_, model=None, override=False, external=False):
+        """
+        Register container class for namespace, for all models or just
+        ``model`` and its subclasses. Data of ``external`` namespaces are
+        stored in a separate table instead of the AppData field and loaded on
+        first access, which needs ``app_data`` in ``INSTALLED_APPS``.
+        """
+        self._check_frozen()
+        if external and not apps.is_installed("app_data"):
+            raise ImproperlyConfigured(
+                f"External namespaces need 'app_data' in INSTALLED_APPS, {namespace!r} can't be stored."
+            )
         registry = self._model_registry.setdefault(model, {}) if model is not None else self._global_registry
         if namespace in registry and not override:
             raise NamespaceConflict(
@@ -45,13 +89,102 @@ class NamespaceRegistry:
                 % (namespace, registry[namespace], "" if model is None else " for model %s" % model._meta),
             )
         registry[namespace] = class_
+        external_namespaces = self._external.setdefault(model, set())
+        if external:
+            external_namespaces.add(namespace)
+        else:
+            external_namespaces.discard(namespace)
+        self._invalidate()
 
     def unregister(self, namespace, model=None):
+        self._check_frozen()
         registry = self._model_registry.setdefault(model, {}) if model is not None else self._global_registry
         if namespace not in registry:
             raise NamespaceMissing("Namespace %r is not registered yet." % namespace)
 
         del registry[namespace]
+        self._external.get(model, set()).discard(namespace)
+        self._invalidate()
+
+    def _resolve_external(self, namespace, model):
+        # the registration get_class() resolves to decides
+        for c in model.mro():
+            if c in self._model_registry and namespace in self._model_registry[c]:
+                return namespace in self._external.get(c, ())
+        return namespace in self._global_registry and namespace in self._external.get(None, ())
+
+    def get_external_namespaces(self, model):
+        """Return a frozenset of namespaces registered as external for model."""
+        try:
+            return self._resolved_external[model]
+        except KeyError:
+            pass
+        namespaces = set(self._global_registry)
+        for registry in self._model_registry.values():
+            namespaces.update(registry)
+        external = self._resolved_external[model] = frozenset(
+            namespace for namespace in namespaces if self._resolve_external(namespace, model)
+        )
+        return external
+
+    def register_upgrade(self, namespace, upgrade, model=None):
+        """
+        Register callable converting data stored in namespace to their current
+        layout. It gets the namespace's data (a dict) and returns the new ones.
+        """
+        self._upgrades.setdefault(model, {})[namespace] = upgrade
+
+    def get_upgrade(self, namespace, model):
+        """Get upgrade callable for namespace in given model, None if there is none."""
+        for c in model.mro():
+            if namespace in self._upgrades.get(c, {}):
+                return self._upgrades[c][namespace]
+        return self._upgrades.get(None, {}).get(namespace)
+
+    def get_upgrades(self, model):
+        """Return {namespace: upgrade} of all upgrades applying to model."""
+        namespaces = set()
+        for registry in self._upgrades.values():
+            namespaces.update(registry)
+        upgrades = {namespace: self.get_upgrade(namespace, model) for namespace in namespaces}
+        return {namespace: upgrade for namespace, upgrade in upgrades.items() if upgrade is not None}
+
+    def _check_frozen(self):
+        if self._frozen is not None:
+            raise RegistryFrozen("Registry is frozen, namespaces can no longer be changed.")
+
+    def freeze(self, models=None):
+        """
+        Compile the registry into an immutable ``{model: {namespace: class}}``
+        mapping. Meant to be called once all apps are loaded; afterwards
+        lookups for the compiled models don't walk the MRO and the registry
+        can no longer be changed.
+
+        By default all installed models are compiled.
+        """
+        if models is None:
+            models = apps.get_models()
+
+        namespaces = set(self._global_registry)
+        for registry in self._model_registry.values():
+            namespaces.update(registry)
+
+        frozen = {}
+        for model in set(models).union(self._model_registry):
+            table = {}
+            for namespace in namespaces:
+                class_ = self._resolve(namespace, model)
+                if class_ is not None:
+                    table[namespace] = class_
+            frozen[model] = MappingProxyType(table)
+
+        self._frozen = MappingProxyType(frozen)
+        self._invalidate()
+
+    @property
+    def frozen(self):
+        """Return a boolean indicating whether the registry has been frozen."""
+        return self._frozen is not None
 
 
 app_registry = NamespaceRegistry()
@@ -0,0 +1,8 @@
+from django.core.serializers import pyyaml
+from django.core.serializers.pyyaml import Deserializer  # noqa: F401
+
+from .json_serializer import AppDataSerializerMixin
+
+
+class Serializer(AppDataSerializerMixin, pyyaml.Serializer):
+    pass
@@ -0,0 +1,212 @@
+"""
+Benchmark cases. Each case is a function taking the number of rows and
+namespaces and returning a callable doing the measured work once for all
+the rows; everything the callable needs is prepared up front.
+"""
+
+import json
+from datetime import date
+
+from django import forms
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+
+from app_data import AppDataContainer, AppDataForm, app_registry, multiform_factory
+from app_data.admin import AppDataModelAdmin
+from test_app_data.admin import AuthorInline
+from test_app_data.models import Article
+
+CASES = {}
+
+
+def case(func):
+    CASES[func.__name__] = func
+    return func
+
+
+class BenchForm(AppDataForm):
+    title = forms.CharField(max_length=100, required=False)
+    description = forms.CharField(required=False)
+    published = forms.BooleanField(required=False)
+    publish_from = forms.DateField(required=False)
+    position = forms.IntegerField(required=False)
+    kind = forms.ChoiceField(choices=[("a", "A"), ("b", "B")], required=False)
+
+
+BenchContainer = AppDataContainer.from_form(BenchForm)
+
+
+def namespace_names(namespaces):
+    return [f"bench{i}" for i in range(namespaces)]
+
+
+def register_namespaces(namespaces):
+    for name in namespace_names(namespaces):
+        if app_registry.get_class(name, Article) is None:
+            app_registry.register(name, BenchContainer, Article)
+
+
+def namespace_data(i):
+    return {
+        "title": f"Title {i}",
+        "description": "Lorem ipsum dolor sit amet " * 4,
+        "published": bool(i % 2),
+        "publish_from": f"2012-08-{i % 28 + 1:02d}",
+        "position": i,
+        "kind": "ab"[i % 2],
+    }
+
+
+def stored_value(namespaces, i=0):
+    return json.dumps({name: namespace_data(i) for name in namespace_names(namespaces)})
+
+
+def loaded_articles(rows, namespaces):
+    """Articles as loaded from the database, app_data not accessed yet."""
+    articles = []
+    for i in range(rows):
+        article = Article.from_db("default", ["id", "app_data"], [i + 1, stored_value(namespaces, i)])
+        articles.append(article)
+    return articles
+
+
+@case
+def descriptor_decode(rows, namespaces):
+    values = [stored_value(namespaces, i) for i in range(rows)]
+
+    def run():
+        for i, value in enumerate(values):
+            _ = Article.from_db("default", ["id", "app_data"], [i + 1, value]).app_data
+
+    return run
+
+
+@case
+def container_read(rows, namespaces):
+    register_namespaces(namespaces)
+    value = stored_value(namespaces)
+    names = namespace_names(namespaces)
+
+    def run():
+        for i in range(rows):
+            app_data = Article.from_db("default", ["id", "app_data"], [i + 1, value]).app_data
+            for name in names:
+                container = app_data[name]
+                _ = container.title, container.published, container.publish_from, container.position
+
+    return run
+
+
+@case
+def container_write(rows, namespaces):
+    register_namespaces(namespaces)
+    names = namespace_names(namespaces)
+    articles = [Article() for _ in range(rows)]
+
+    def run():
+        for article in articles:
+            for name in names:
+                container = article.app_data[name]
+                container.title = "Title"
+                container.published = True
+                container.publish_from = date(2012, 8, 26)
+                container.position = 1
+
+    return run
+
+
+@case
+def factory_serialize(rows, namespaces):
+    register_namespaces(namespaces)
+    names = namespace_names(namespaces)
+    articles = loaded_articles(rows, namespaces)
+
+    def run():
+        # serialize() replaces the containers with their data, modify them again
+        for article in articles:
+            app_data = article.app_data
+            for name in names:
+                app_data[name].title = "Changed"
+            app_data.serialize()
+
+    return run
+
+
+@case
+def factory_validate(rows, namespaces):
+    register_namespaces(namespaces)
+    names = namespace_names(namespaces)
+    articles = loaded_articles(rows, namespaces)
+    for article in articles:
+        for name in names:
+            _ = article.app_data[name].title
+
+    def run():
+        for article in articles:
+            article.app_data.validate(article)
+
+    return run
+
+
+@case
+def multiform_validate(rows, namespaces):
+    register_namespaces(namespaces)
+    names = namespace_names(namespaces)
+    MultiForm = multiform_factory(Article, fields=["file"])
+    data = {}
+    for name in names:
+        MultiForm.add_form(name, {})
+        data.update((f"{name}-{key}", value) for key, value in namespace_data(1).items())
+
+    def run():
+        for _ in range(rows):
+            form = MultiForm(data)
+            form.is_valid()
+
+    return run
+
+
+def admin_request():
+    request = RequestFactory().get("/admin/test_app_data/article/add/")
+    request.user = User(username="admin", is_active=True, is_staff=True, is_superuser=True)
+    return request
+
+
+def bench_model_admin(namespaces):
+    names = namespace_names(namespaces)
+
+    class BenchArticleAdmin(AppDataModelAdmin):
+        declared_fieldsets = [(None, {"fields": ["file"]})] + [
+            (name, {"fields": [f"{name}.{f}" for f in BenchForm.base_fields]}) for name in names
+        ]
+        inlines = (AuthorInline,)
+
+    return BenchArticleAdmin(Article, admin.site)
+
+
+@case
+def admin_get_form(rows, namespaces):
+    register_namespaces(namespaces)
+    model_admin = bench_model_admin(namespaces)
+    request = admin_request()
+
+    def run():
+        for _ in range(rows):
+            model_admin.get_form(request)
+
+    return run
+
+
+@case
+def admin_get_formsets(rows, namespaces):
+    register_namespaces(namespaces)
+    model_admin = bench_model_admin(namespaces)
+    request = admin_request()
+
+    def run():
+        for _ in range(rows):
+            for inline in model_admin.get_inline_instances(request):
+                inline.get_formset(request)
+
+    return run
@@ -0,0 +1,150 @@
+"""
+Run the benchmark suite and store the results as JSON::
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --rows 1000 10000 100000 --namespaces 1 10 30
+    python -m benchmarks.run --compare baseline.json --output results.json
+
+Every case is run for each combination of rows and namespaces, ``--repeat``
+times; the fastest and the median run are reported along with the peak
+memory allocated during one extra traced run.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "test_app_data.settings")
+    import django
+
+    django.setup()
+
+
+def measure(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return timings, peak
+
+
+def run_suite(cases, rows_list, namespaces_list, repeat, admin_rows):
+    from .cases import CASES
+
+    results = []
+    for name in cases or CASES:
+        for namespaces in namespaces_list:
+            for rows in rows_list:
+                # forms and admin work is per request, not per row
+                if name.startswith(("multiform", "admin")):
+                    rows = min(rows, admin_rows)
+                run = CASES[name](rows, namespaces)
+                timings, peak = measure(run, repeat)
+                result = {
+                    "case": name,
+                    "rows": rows,
+                    "namespaces": namespaces,
+                    "repeat": repeat,
+                    "min": min(timings),
+                    "median": statistics.median(timings),
+                    "per_row_us": min(timings) / rows * 1e6,
+                    "peak_memory": peak,
+                }
+                results.append(result)
+                print(
+                    "{case:<22} rows={rows:<7} namespaces={namespaces:<3} min={min:.4f}s "
+                    "per_row={per_row_us:.2f}us peak={peak_memory}B".format(**result),
+                    file=sys.stderr,
+                )
+    return results
+
+
+def environment():
+    import django
+
+    import app_data
+
+    return {
+        "date": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "django": django.get_version(),
+        "app_data": app_data.__version__,
+    }
+
+
+def key(result):
+    return result["case"], result["rows"], result["namespaces"]
+
+
+def compare(results, baseline, threshold):
+    """Print relative change against baseline results, return number of regressions."""
+    previous = {key(r): r for r in baseline["results"]}
+    regressions = 0
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        ratio = result["min"] / old["min"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(
+            "{:<22} rows={:<7} namespaces={:<3} {:.4f}s -> {:.4f}s ({:+.1%}){}".format(
+                *key(result), old["min"], result["min"], ratio - 1, flag
+            )
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="django-appdata benchmarks")
+    parser.add_argument("cases", nargs="*", help="cases to run, all by default")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--namespaces", type=int, nargs="+", default=[1, 10, 30])
+    parser.add_argument("--admin-rows", type=int, default=100, help="maximum iterations of form and admin cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="file to store the results in as JSON")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from .cases import CASES
+
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))} (choose from {', '.join(CASES)})")
+
+    results = run_suite(args.cases, args.rows, args.namespaces, args.repeat, args.admin_rows)
+    data = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(data, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            return 1 if compare(results, json.load(f), args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,8 @@ class AppDataTestCase(TestCase):
         super().setUp()
         self._old_global_registry = app_registry._global_registry.copy()
         self._old_model_registry = app_registry._model_registry.copy()
+        self._old_upgrades = app_registry._upgrades.copy()
+        self._old_external = {model: set(namespaces) for model, namespaces in app_registry._external.items()}
 
     def tearDown(self):
         super().tearDown()
@@ -17,3 +19,6 @@ class AppDataTestCase(TestCase):
         app_registry.default_class = None
         app_registry._global_registry = self._old_global_registry
         app_registry._model_registry = self._old_model_registry
+        app_registry._upgrades = self._old_upgrades
+        app_registry._external = self._old_external
+        app_registry._invalidate()
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:33
+
+from django.db import migrations, models
+
+import app_data.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_app_data", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LazyModel",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("app_data", app_data.fields.AppDataField(default="{}", editable=False, lazy=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:34
+
+from django.db import migrations, models
+
+import app_data.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_app_data", "0002_lazymodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JSONModel",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("app_data", app_data.fields.AppDataJSONField(default=dict, editable=False)),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:41
+
+from django.db import migrations, models
+
+import app_data.fields
+import app_data.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_app_data", "0003_jsonmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PartialJSONModel",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("app_data", app_data.fields.AppDataJSONField(default=dict, editable=False, partial_updates=True)),
+            ],
+            bases=(app_data.models.AppDataModelMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name="PartialModel",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("app_data", app_data.fields.AppDataField(default="{}", editable=False, partial_updates=True)),
+            ],
+            bases=(app_data.models.AppDataModelMixin, models.Model),
+        ),
+    ]
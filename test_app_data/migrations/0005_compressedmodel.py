@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:02
+
+from django.db import migrations, models
+
+import app_data.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_app_data", "0004_partialmodels"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompressedModel",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("app_data", app_data.fields.CompressedAppDataField(compress_threshold=100, default=b"{}")),
+            ],
+        ),
+    ]
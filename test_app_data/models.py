@@ -1,7 +1,17 @@
 from django import forms
 from django.db import models
 
-from app_data import AppDataContainer, AppDataField, AppDataForm, NamespaceRegistry, app_registry
+from app_data import (
+    AppDataContainer,
+    AppDataField,
+    AppDataForm,
+    AppDataJSONField,
+    CompressedAppDataField,
+    NamespaceRegistry,
+    app_registry,
+)
+from app_data.models import AppDataModelMixin
+from app_data.query import AppDataManager
 
 
 class Category(models.Model):
@@ -15,8 +25,10 @@ class Publishable(models.Model):
 class Article(Publishable):
     file = models.FileField(blank=True)
 
+    objects = AppDataManager()
 
-class Author(models.Model):
+
+class Author(AppDataModelMixin, models.Model):
     publishable = models.ForeignKey(Publishable, on_delete=models.CASCADE)
     app_data = AppDataField()
 
@@ -26,6 +38,26 @@ class AlternateRegistryModel(models.Model):
     app_data = AppDataField(app_registry=alternate_registry)
 
 
+class LazyModel(models.Model):
+    app_data = AppDataField(lazy=True)
+
+
+class JSONModel(models.Model):
+    app_data = AppDataJSONField()
+
+
+class PartialModel(AppDataModelMixin, models.Model):
+    app_data = AppDataField(partial_updates=True)
+
+
+class PartialJSONModel(AppDataModelMixin, models.Model):
+    app_data = AppDataJSONField(partial_updates=True)
+
+
+class CompressedModel(models.Model):
+    app_data = CompressedAppDataField(compress_threshold=100)
+
+
 class PublishAppForm(AppDataForm):
     publish_from = forms.DateTimeField()
     published = forms.BooleanField(required=False)
@@ -39,5 +39,6 @@ INSTALLED_APPS = (
     "django.contrib.sessions",
     "django.contrib.admin",
     "django.contrib.messages",
+    "app_data",
     "test_app_data",
 )
@@ -1,7 +1,15 @@
+from unittest import mock
+
+from django.contrib.admin import site
 from django.contrib.auth.models import User
+from django.test import RequestFactory
+
+from app_data.admin import AppDataModelAdmin
+from app_data.forms import multiform_factory
 
+from .admin import ArticleModelAdmin, AuthorInline
 from .cases import AppDataTestCase
-from .models import Article, Author
+from .models import Article, Author, Publishable
 
 
 class TestAppDataAdmin(AppDataTestCase):
@@ -60,3 +68,88 @@ class TestAppDataAdmin(AppDataTestCase):
     def test_admin_can_render_multiform(self):
         response = self.client.get(self.url + "add/")
         self.assertEqual(200, response.status_code)
+
+
+class TestFormClassCache(AppDataTestCase):
+    def setUp(self):
+        super().setUp()
+        self.request = RequestFactory().get("/")
+        self.request.user = User(username="admin", is_active=True, is_staff=True, is_superuser=True)
+
+    def _admin(self, **attrs):
+        return type("CachedArticleAdmin", (ArticleModelAdmin,), attrs)(Article, site)
+
+    def test_form_class_is_reused(self):
+        model_admin = self._admin()
+        self.assertIs(model_admin.get_form(self.request), model_admin.get_form(self.request))
+
+    def test_form_options_are_part_of_the_key(self):
+        model_admin = self._admin(get_readonly_fields=lambda self, request, obj=None: getattr(request, "readonly", ()))
+        form = model_admin.get_form(self.request)
+        self.request.readonly = ["rss.author"]
+        readonly_form = model_admin.get_form(self.request)
+        self.assertIsNot(form, readonly_form)
+        self.assertNotIn("rss.author", readonly_form.base_fields)
+        self.assertIs(readonly_form, model_admin.get_form(self.request))
+
+    def test_admin_configuration_is_part_of_the_key(self):
+        model_admin = self._admin()
+        form = model_admin.get_form(self.request)
+        model_admin.formfield_overrides = {}
+        self.assertIsNot(form, model_admin.get_form(self.request))
+
+    def test_related_admin_permissions_are_part_of_the_key(self):
+        model_admin = AuthorInline(Article, site)
+        with mock.patch.dict(site._registry, {Publishable: ArticleModelAdmin(Publishable, site)}):
+            key = model_admin.get_form_cache_key(self.request)
+            self.assertEqual((("publishable", True, True, True, True, ()),), key)
+            self.request.user = User.objects.create_user("other", is_staff=True)
+            self.assertEqual(
+                (("publishable", False, False, False, False, ()),), model_admin.get_form_cache_key(self.request)
+            )
+
+    def test_related_admin_ordering_is_part_of_the_key(self):
+        model_admin = type("AuthorAdmin", (AppDataModelAdmin,), {"fields": ["publishable"]})(Author, site)
+        related_admin = ArticleModelAdmin(Publishable, site)
+        related_admin.get_ordering = lambda request: getattr(request, "ordering", ())
+        with mock.patch.dict(site._registry, {Publishable: related_admin}):
+            form = model_admin.get_form(self.request)
+            self.request.ordering = ["-pk"]
+            ordered = model_admin.get_form(self.request)
+            self.assertIsNot(form, ordered)
+            self.assertEqual(("-pk",), ordered.ModelForm.base_fields["publishable"].queryset.query.order_by)
+
+    def test_cached_form_class_does_not_keep_request(self):
+        model_admin = self._admin()
+        with mock.patch("app_data.admin.multiform_factory", wraps=multiform_factory) as factory:
+            model_admin.get_form(self.request)
+        self.assertIsNone(factory.call_args.kwargs["formfield_callback"].request)
+
+    def test_overridden_formfield_hooks_disable_the_cache(self):
+        def formfield_for_dbfield(self, db_field, request, **kwargs):
+            return super(ArticleModelAdmin, self).formfield_for_dbfield(db_field, request, **kwargs)
+
+        model_admin = self._admin(formfield_for_dbfield=formfield_for_dbfield)
+        self.assertIsNot(model_admin.get_form(self.request), model_admin.get_form(self.request))
+
+    def test_cache_can_be_disabled(self):
+        model_admin = self._admin(form_cache_size=0)
+        self.assertIsNot(model_admin.get_form(self.request), model_admin.get_form(self.request))
+
+    def test_inline_formset_class_is_reused(self):
+        inline = AuthorInline(Article, site)
+        formset = inline.get_formset(self.request)
+        self.assertIs(formset, inline.get_formset(self.request))
+        self.assertEqual(
+            ["personal.first_name", "personal.last_name"], [f for f in formset.form.base_fields if "." in f]
+        )
+
+    def test_inline_options_are_part_of_the_key(self):
+        inline = AuthorInline(Article, site)
+        formset = inline.get_formset(self.request)
+        inline.extra = 1
+        self.assertIsNot(formset, inline.get_formset(self.request))
+        self.assertEqual(1, inline.get_formset(self.request).extra)
+        with mock.patch.object(AuthorInline, "has_delete_permission", return_value=False):
+            self.assertFalse(inline.get_formset(self.request).can_delete)
+        self.assertTrue(inline.get_formset(self.request).can_delete)
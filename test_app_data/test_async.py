@@ -0,0 +1,86 @@
+from asgiref.sync import sync_to_async
+from django import forms
+from django.core.exceptions import SynchronousOnlyOperation, ValidationError
+
+from app_data.containers import AppDataContainer, AppDataForm
+from app_data.fields import ListModelMultipleChoiceField
+from app_data.query import aprefetch_app_data
+from app_data.registry import app_registry
+
+from .cases import AppDataTestCase
+from .models import Article, Category
+
+
+class TestAsyncAccess(AppDataTestCase):
+    def setUp(self):
+        super().setUp()
+
+        class RelatedForm(AppDataForm):
+            category = forms.ModelChoiceField(Category.objects.all(), required=False)
+            categories = ListModelMultipleChoiceField(Category.objects.all(), required=False)
+            category_set = forms.ModelMultipleChoiceField(Category.objects.all(), required=False)
+            title = forms.CharField(max_length=5, required=False)
+
+        app_registry.register("related", AppDataContainer.from_form(RelatedForm))
+        app_registry.register("history", AppDataContainer, external=True)
+        self.categories = [Category.objects.create() for _ in range(3)]
+        for i in range(3):
+            article = Article()
+            article.app_data.related.category = self.categories[i]
+            article.app_data.related.categories = self.categories[: i + 1]
+            article.app_data.related.category_set = self.categories[: i + 1]
+            article.app_data.related.title = f"T{i}"
+            article.app_data.history["log"] = [i]
+            article.save()
+
+    async def test_reading_reference_from_event_loop_is_not_allowed(self):
+        article = await sync_to_async(Article.objects.order_by("pk").first)()
+        self.assertRaises(SynchronousOnlyOperation, getattr, article.app_data.related, "category")
+
+    async def test_aget_resolves_references(self):
+        article = await sync_to_async(Article.objects.order_by("pk").last)()
+        related = article.app_data.related
+
+        self.assertEqual(self.categories[2], await related.aget("category"))
+        self.assertEqual(self.categories, await related.aget("categories"))
+        self.assertEqual(self.categories, list(await related.aget("category_set")))
+        self.assertEqual("T2", await related.aget("title"))
+        # cleaned values are cached
+        self.assertEqual(self.categories[2], related.category)
+
+    async def test_aget_of_missing_value(self):
+        article = Article()
+        self.assertIsNone(await article.app_data.related.aget("category"))
+        self.assertEqual([], await article.app_data.related.aget("categories"))
+        self.assertIsNone(await article.app_data.related.aget("missing"))
+        self.assertEqual(1, await article.app_data.related.aget("missing", 1))
+
+    async def test_aget_reports_invalid_reference(self):
+        article = Article()
+        article.app_data.related._data["category"] = 0
+        with self.assertRaises(ValidationError):
+            await article.app_data.related.aget("category")
+
+    async def test_factory_aget_loads_external_namespace(self):
+        article = await sync_to_async(Article.objects.order_by("pk").first)()
+        self.assertEqual({"log": [0]}, await article.app_data.aget("history"))
+        self.assertEqual({"log": [0]}, article.app_data["history"])
+        self.assertIsNone(await article.app_data.aget("unknown"))
+
+    async def test_aprefetch_app_data(self):
+        articles = await sync_to_async(list)(Article.objects.order_by("pk"))
+        await aprefetch_app_data(articles, "related.category", "related.category_set", "history")
+
+        # no queries are run from the event loop any more
+        self.assertEqual(self.categories, [article.app_data.related.category for article in articles])
+        self.assertEqual(self.categories, list(articles[2].app_data.related.category_set))
+        self.assertEqual([[0], [1], [2]], [article.app_data.history["log"] for article in articles])
+
+    async def test_avalidate(self):
+        article = await sync_to_async(Article.objects.order_by("pk").first)()
+        await article.app_data.avalidate(article)
+        await article.app_data.related.avalidate(article.app_data, article)
+
+        article.app_data.related.title = "Too long"
+        with self.assertRaises(ValidationError):
+            await article.app_data.related.avalidate(article.app_data, article)
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+
+from app_data.registry import app_registry
+
+from .cases import AppDataTestCase
+from .models import Article, Author, CompressedModel
+
+
+def upgrade_title(data):
+    if "name" in data:
+        data["title"] = data.pop("name")
+    return data
+
+
+class TestRewriteAppData(AppDataTestCase):
+    def setUp(self):
+        super().setUp()
+        app_registry.register_upgrade("legacy", upgrade_title)
+        self.articles = [
+            Article.objects.create(app_data={"legacy": {"name": f"Article {i}"}, "other": {"name": "x"}})
+            for i in range(5)
+        ]
+        self.untouched = Article.objects.create(app_data={"other": {"name": "y"}})
+
+    def _call(self, *args, **kwargs):
+        out = StringIO()
+        call_command("rewrite_app_data", "test_app_data.Article", *args, stdout=out, **kwargs)
+        return out.getvalue()
+
+    def test_upgrades_are_applied_in_chunks(self):
+        out = self._call("--chunk-size", "2")
+        self.assertIn("6 rows processed, 5 updated in 3 chunks", out)
+        for i, article in enumerate(self.articles):
+            self.assertEqual(
+                {"legacy": {"title": f"Article {i}"}, "other": {"name": "x"}},
+                Article.objects.get(pk=article.pk).app_data,
+            )
+        self.assertEqual({"other": {"name": "y"}}, Article.objects.get(pk=self.untouched.pk).app_data)
+
+    def test_only_app_data_column_is_written(self):
+        Article.objects.filter(pk=self.articles[0].pk).update(file="changed.txt")
+        self._call()
+        self.assertEqual("changed.txt", Article.objects.get(pk=self.articles[0].pk).file.name)
+
+    def test_upgrades_can_be_limited_to_namespaces(self):
+        app_registry.register_upgrade("other", upgrade_title)
+        self._call("--namespace", "other")
+        article = Article.objects.get(pk=self.articles[0].pk)
+        self.assertEqual({"legacy": {"name": "Article 0"}, "other": {"title": "x"}}, article.app_data)
+
+    def test_upgrades_are_per_model(self):
+        app_registry.register_upgrade("personal", upgrade_title, Author)
+        self.assertEqual({"legacy": upgrade_title}, app_registry.get_upgrades(Article))
+        self.assertEqual({"legacy": upgrade_title, "personal": upgrade_title}, app_registry.get_upgrades(Author))
+
+    def test_rewrite_resumes_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = os.path.join(tmp, "checkpoint.json")
+            with open(checkpoint, "w") as f:
+                json.dump({"model": "test_app_data.Article", "field": "app_data", "last_pk": self.articles[2].pk}, f)
+            out = self._call("--checkpoint", checkpoint, "--chunk-size", "2")
+            with open(checkpoint) as f:
+                self.assertEqual(self.untouched.pk, json.load(f)["last_pk"])
+
+        self.assertIn(f"Resuming after primary key {self.articles[2].pk!r}", out)
+        self.assertIn("3 rows processed, 2 updated", out)
+        self.assertEqual({"name": "Article 2"}, Article.objects.get(pk=self.articles[2].pk).app_data["legacy"])
+        self.assertEqual({"title": "Article 3"}, Article.objects.get(pk=self.articles[3].pk).app_data["legacy"])
+
+    def test_invalid_arguments(self):
+        self.assertRaises(CommandError, call_command, "rewrite_app_data", "test_app_data.Unknown")
+        self.assertRaises(CommandError, call_command, "rewrite_app_data", "test_app_data.Article", "--field", "file")
+        self.assertRaises(CommandError, call_command, "rewrite_app_data", "test_app_data.Article", "--workers", "2")
+
+    def test_model_without_upgrades(self):
+        app_registry._upgrades = {Author: {"personal": upgrade_title}}
+        self.assertRaises(CommandError, call_command, "rewrite_app_data", "test_app_data.Category")
+
+    def test_compressed_field(self):
+        # above the threshold of CompressedModel so that it's stored compressed
+        large = CompressedModel.objects.create(app_data={"legacy": {"name": "x" * 200}})
+        small = CompressedModel.objects.create(app_data={"legacy": {"name": "small"}})
+
+        out = StringIO()
+        call_command("rewrite_app_data", "test_app_data.CompressedModel", stdout=out)
+        self.assertIn("2 rows processed, 2 updated", out.getvalue())
+        self.assertEqual({"legacy": {"title": "x" * 200}}, CompressedModel.objects.get(pk=large.pk).app_data)
+        self.assertEqual({"legacy": {"title": "small"}}, CompressedModel.objects.get(pk=small.pk).app_data)
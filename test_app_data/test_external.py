@@ -0,0 +1,170 @@
+import json
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldError, ImproperlyConfigured
+from django.db import connection
+from django.test import modify_settings
+from django.test.utils import CaptureQueriesContext
+
+from app_data.containers import AppDataContainer
+from app_data.models import ExternalAppData
+from app_data.query import prefetch_app_data
+from app_data.registry import app_registry
+
+from .cases import AppDataTestCase
+from .models import Article, Category, PartialModel, Publishable
+
+
+class TestExternalNamespaces(AppDataTestCase):
+    def setUp(self):
+        super().setUp()
+        app_registry.register("history", AppDataContainer, external=True)
+        app_registry.register("meta", AppDataContainer)
+
+    def _rows(self, model=Category):
+        return dict(
+            ExternalAppData.objects.filter(content_type=ContentType.objects.get_for_model(model)).values_list(
+                "namespace", "data"
+            )
+        )
+
+    def test_registry_knows_external_namespaces(self):
+        self.assertEqual(frozenset({"history"}), app_registry.get_external_namespaces(Category))
+        app_registry.register("history", AppDataContainer, override=True)
+        self.assertEqual(frozenset(), app_registry.get_external_namespaces(Category))
+
+    @modify_settings(INSTALLED_APPS={"remove": "app_data"})
+    def test_external_namespaces_need_installed_app(self):
+        self.assertRaises(
+            ImproperlyConfigured, app_registry.register, "log", AppDataContainer, Category, external=True
+        )
+        self.assertIsNone(app_registry.get_class("log", Category))
+
+    def test_external_namespace_is_stored_in_side_table(self):
+        category = Category()
+        category.app_data["history"]["log"] = [1, 2]
+        category.app_data["meta"]["title"] = "Title"
+        category.save()
+
+        self.assertEqual(
+            {"meta": {"title": "Title"}}, json.loads(Category.objects.values_list("app_data", flat=True).get())
+        )
+        self.assertEqual({"history": '{"log": [1, 2]}'}, self._rows())
+
+    def test_external_namespace_is_loaded_on_first_access(self):
+        category = Category()
+        category.app_data["history"]["log"] = [1, 2]
+        category.save()
+        category = Category.objects.get(pk=category.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual({}, dict(category.app_data))
+            self.assertEqual(0, len(queries))
+            self.assertEqual([1, 2], category.app_data["history"]["log"])
+            self.assertEqual([1, 2], category.app_data.history["log"])
+        self.assertEqual(1, len(queries))
+
+    def test_missing_external_namespace_is_not_loaded_for_new_instances(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual({}, Category().app_data["history"])
+        self.assertEqual(0, len(queries))
+
+    def test_unchanged_external_namespace_is_not_rewritten(self):
+        category = Category()
+        category.app_data["history"]["log"] = [1]
+        category.save()
+        category = Category.objects.get(pk=category.pk)
+        category.app_data["history"]
+
+        with CaptureQueriesContext(connection) as queries:
+            category.save()
+        self.assertFalse([q for q in queries if "app_data_externalappdata" in q["sql"]])
+
+    def test_changed_external_namespace_is_updated(self):
+        category = Category()
+        category.app_data["history"]["log"] = [1]
+        category.save()
+        category = Category.objects.get(pk=category.pk)
+        category.app_data["history"]["log"] = [1, 2]
+        category.save()
+
+        self.assertEqual({"history": '{"log": [1, 2]}'}, self._rows())
+        self.assertEqual(1, ExternalAppData.objects.count())
+
+    def test_removed_external_namespace_is_deleted(self):
+        category = Category()
+        category.app_data["history"]["log"] = [1]
+        category.save()
+        category = Category.objects.get(pk=category.pk)
+        del category.app_data["history"]
+        category.save()
+
+        self.assertEqual({}, self._rows())
+
+    def test_rows_are_deleted_with_instance(self):
+        category = Category()
+        category.app_data["history"]["log"] = [1]
+        category.save()
+        category.delete()
+
+        self.assertFalse(ExternalAppData.objects.exists())
+
+    def test_namespace_stored_in_field_moves_to_side_table(self):
+        Category.objects.create(app_data={"history": {"log": [1]}, "meta": {"title": "Title"}})
+        app_registry.register("history", AppDataContainer, override=True, external=True)
+        category = Category.objects.get()
+        self.assertEqual([1], category.app_data["history"]["log"])
+        category.save()
+
+        self.assertEqual(
+            {"meta": {"title": "Title"}}, json.loads(Category.objects.values_list("app_data", flat=True).get())
+        )
+        self.assertEqual({"history": '{"log": [1]}'}, self._rows())
+
+    def test_partial_updates_leave_external_namespace_out_of_field(self):
+        instance = PartialModel.objects.create()
+        instance.app_data["history"]["log"] = [1]
+        instance.app_data["meta"]["title"] = "Title"
+        instance.save()
+
+        self.assertEqual(
+            {"meta": {"title": "Title"}}, json.loads(PartialModel.objects.values_list("app_data", flat=True).get())
+        )
+        instance = PartialModel.objects.get()
+        self.assertEqual({"log": [1]}, instance.app_data["history"])
+
+    def test_multi_table_inheritance_shares_rows_of_parent(self):
+        article = Article()
+        article.app_data["history"]["log"] = [1]
+        article.save()
+
+        self.assertEqual({"history": '{"log": [1]}'}, self._rows(Publishable))
+        self.assertEqual({"log": [1]}, Publishable.objects.get().app_data["history"])
+
+    def test_prefetch_loads_namespace_with_single_query(self):
+        for i in range(3):
+            category = Category()
+            category.app_data["history"]["log"] = [i]
+            category.save()
+        Category.objects.create()
+
+        categories = list(Category.objects.order_by("pk"))
+        with CaptureQueriesContext(connection) as queries:
+            prefetch_app_data(categories, "history")
+            self.assertEqual([[0], [1], [2], None], [c.app_data["history"].get("log") for c in categories])
+        # content type is cached
+        self.assertEqual(1, len(queries))
+
+    def test_queryset_prefetch_app_data_accepts_external_namespaces(self):
+        article = Article()
+        article.app_data["history"]["log"] = [1]
+        article.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            article = Article.objects.prefetch_app_data("history").get()
+            self.assertEqual([1], article.app_data["history"]["log"])
+        self.assertEqual(2, len(queries))
+
+    def test_prefetch_rejects_namespace_not_external(self):
+        category = Category.objects.create()
+        self.assertRaises(FieldError, prefetch_app_data, [category], "meta")
@@ -1,13 +1,41 @@
+import json
 import pickle
-from datetime import date
+import tracemalloc
+from datetime import date, datetime
+from unittest import mock, skipUnless
 
 from django import forms
-
+from django.core import serializers
+from django.core.exceptions import ValidationError
+from django.db import connection, models
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app_data import json_serializer
+from app_data.codecs import CanonicalJSONCodec, CompactJSONCodec, JSONCodec, RawJSON, get_codec, split_namespaces
 from app_data.containers import AppDataContainer, AppDataForm
-from app_data.registry import NamespaceConflict, NamespaceMissing, app_registry
+from app_data.fields import AppDataField, AppDataJSONField, CompressedAppDataField
+from app_data.models import get_update_fields
+from app_data.registry import NamespaceConflict, NamespaceMissing, NamespaceRegistry, RegistryFrozen, app_registry
 
 from .cases import AppDataTestCase
-from .models import AlternateRegistryModel, Article, Publishable
+from .models import (
+    AlternateRegistryModel,
+    Article,
+    Author,
+    CompressedModel,
+    JSONModel,
+    LazyModel,
+    PartialJSONModel,
+    PartialModel,
+    Publishable,
+)
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
 
 
 class DummyAppDataContainer(AppDataContainer):
@@ -65,7 +93,7 @@ class TestForms(AppDataTestCase):
         self.assertEqual("", art.app_data.myapp.description)
 
 
-class TestSerialization(AppDataTestCase):
+class SerializationTestCase(AppDataTestCase):
     class MyForm(AppDataForm):
         publish_from = forms.DateField()
 
@@ -85,6 +113,15 @@ class TestSerialization(AppDataTestCase):
         self.assertEqual(date(2012, 8, 26), art.app_data.myapp["publish_from"])
         self.assertEqual(date(2012, 8, 26), art.app_data.myapp.publish_from)
 
+    def _roundtrip(self, format, objects, serializer=None):
+        data = serializer().serialize(objects) if serializer else serializers.serialize(format, objects)
+        for obj in serializers.deserialize(format, data):
+            obj.object.pk = None
+            obj.save()
+        return data
+
+
+class TestSerialization(SerializationTestCase):
     def test_dates_are_serialized_on_write(self):
         art = Article.objects.get(pk=self.article.pk)
         self._test_article(art)
@@ -100,6 +137,45 @@ class TestSerialization(AppDataTestCase):
         unpickled_article = pickle.loads(data)
         self._test_article(unpickled_article)
 
+    def test_fixtures_contain_encoded_data(self):
+        data = self._roundtrip("json", Publishable.objects.filter(pk=self.article.pk))
+        self.assertEqual('{"myapp": {"publish_from": "2012-08-26"}}', json.loads(data)[0]["fields"]["app_data"])
+        self._test_article(Publishable.objects.latest("pk"))
+
+    def test_app_data_serializer_writes_nested_data(self):
+        data = self._roundtrip("json", Publishable.objects.filter(pk=self.article.pk), json_serializer.Serializer)
+        self.assertEqual({"myapp": {"publish_from": "2012-08-26"}}, json.loads(data)[0]["fields"]["app_data"])
+        self._test_article(Publishable.objects.latest("pk"))
+
+    def test_lazy_field_fixtures_contain_nested_data(self):
+        inst = LazyModel.objects.create(app_data={"myapp": {"publish_from": "2012-08-26"}, "other": {"a": [1]}})
+        data = self._roundtrip("json", LazyModel.objects.filter(pk=inst.pk), json_serializer.Serializer)
+        self.assertEqual(
+            {"myapp": {"publish_from": "2012-08-26"}, "other": {"a": [1]}}, json.loads(data)[0]["fields"]["app_data"]
+        )
+        self.assertEqual({"a": [1]}, LazyModel.objects.latest("pk").app_data["other"])
+
+    def test_xml_fixtures_contain_encoded_data(self):
+        data = self._roundtrip("xml", Publishable.objects.filter(pk=self.article.pk))
+        self.assertIn('type="TextField">{"myapp": {"publish_from": "2012-08-26"}}</field>', data)
+        self._test_article(Publishable.objects.latest("pk"))
+
+    def test_xml_fixtures_of_json_field(self):
+        inst = JSONModel.objects.create(app_data={"myapp": {"publish_from": "2012-08-26"}})
+        data = self._roundtrip("xml", JSONModel.objects.filter(pk=inst.pk))
+        self.assertIn('type="JSONField">{"myapp": {"publish_from": "2012-08-26"}}</field>', data)
+        self._test_article(JSONModel.objects.latest("pk"))
+
+
+@skipUnless(yaml, "PyYAML is not installed")
+class TestYAMLSerialization(SerializationTestCase):
+    def test_app_data_yaml_serializer_writes_nested_data(self):
+        from app_data import yaml_serializer
+
+        data = self._roundtrip("yaml", Publishable.objects.filter(pk=self.article.pk), yaml_serializer.Serializer)
+        self.assertIn("app_data:\n      myapp:\n        publish_from: '2012-08-26'", data)
+        self._test_article(Publishable.objects.latest("pk"))
+
 
 class TestAppDataContainers(AppDataTestCase):
     def test_registered_classes_can_behave_as_attrs(self):
@@ -175,3 +251,561 @@ class TestAppDataContainers(AppDataTestCase):
         inst = Publishable()
         with self.assertRaises(AttributeError):
             _get_namespace(inst, "alternate")
+
+
+class TestNamespaceRegistry(AppDataTestCase):
+    def setUp(self):
+        super().setUp()
+        self.registry = NamespaceRegistry()
+
+    def test_resolved_class_is_cached(self):
+        self.registry.register("dummy", DummyAppDataContainer)
+        self.assertIs(DummyAppDataContainer, self.registry.get_class("dummy", Article))
+        self.assertEqual(DummyAppDataContainer, self.registry._resolved[(Article, "dummy")])
+
+    def test_cache_is_cleared_on_register(self):
+        self.registry.register("dummy", DummyAppDataContainer)
+        self.assertIs(DummyAppDataContainer, self.registry.get_class("dummy", Article))
+        self.registry.register("dummy", DummyAppDataContainer2, model=Publishable)
+        self.assertIs(DummyAppDataContainer2, self.registry.get_class("dummy", Article))
+
+    def test_cache_is_cleared_on_unregister(self):
+        self.registry.register("dummy", DummyAppDataContainer)
+        self.assertIs(DummyAppDataContainer, self.registry.get_class("dummy", Article))
+        self.registry.unregister("dummy")
+        self.assertIsNone(self.registry.get_class("dummy", Article))
+
+    def test_default_class_is_not_cached(self):
+        self.assertIsNone(self.registry.get_class("dummy", Article))
+        self.registry.default_class = AppDataContainer
+        self.assertIs(AppDataContainer, self.registry.get_class("dummy", Article))
+
+    def test_frozen_registry_resolves_namespaces(self):
+        self.registry.register("dummy", DummyAppDataContainer)
+        self.registry.register("dummy", DummyAppDataContainer2, model=Publishable)
+        self.registry.freeze()
+
+        self.assertTrue(self.registry.frozen)
+        self.assertIs(DummyAppDataContainer2, self.registry.get_class("dummy", Article))
+        self.assertIs(DummyAppDataContainer, self.registry.get_class("dummy", Author))
+        self.assertIsNone(self.registry.get_class("other", Article))
+
+    def test_frozen_registry_cannot_be_changed(self):
+        self.registry.freeze(models=[Article])
+        with self.assertRaises(RegistryFrozen):
+            self.registry.register("dummy", DummyAppDataContainer)
+        with self.assertRaises(RegistryFrozen):
+            self.registry.unregister("dummy")
+
+
+class TestLazyDecoding(AppDataTestCase):
+    class MyForm(AppDataForm):
+        publish_from = forms.DateField()
+
+    def setUp(self):
+        super().setUp()
+        app_registry.register("myapp", AppDataContainer.from_form(self.MyForm))
+
+    def test_split_namespaces_keeps_fragments_undecoded(self):
+        data = split_namespaces('{"a": {"x": "}{][\\"", "y": [1, {"z": null}]}, "b" :true,"c": -1.5e3 }')
+        self.assertEqual(
+            {
+                "a": RawJSON('{"x": "}{][\\"", "y": [1, {"z": null}]}'),
+                "b": RawJSON("true"),
+                "c": RawJSON("-1.5e3"),
+            },
+            data,
+        )
+        self.assertEqual({"x": '}{]["', "y": [1, {"z": None}]}, data["a"].decode())
+
+    def test_split_namespaces_of_empty_object(self):
+        self.assertEqual({}, split_namespaces(" { } "))
+
+    def test_dumps_namespaces_writes_fragments_verbatim(self):
+        self.assertEqual(
+            '{"a": {"x" :1}, "b": [2]}',
+            JSONCodec().dumps_namespaces({"a": RawJSON('{"x" :1}'), "b": [2]}),
+        )
+
+    def test_namespaces_are_decoded_on_access(self):
+        LazyModel.objects.create(app_data='{"myapp": {"publish_from": "2012-08-26"}, "other": {"a" :  1}}')
+        inst = LazyModel.objects.get()
+        self.assertIsInstance(dict.__getitem__(inst.app_data, "myapp"), RawJSON)
+
+        self.assertEqual(date(2012, 8, 26), inst.app_data.myapp.publish_from)
+        self.assertIsInstance(dict.__getitem__(inst.app_data, "other"), RawJSON)
+
+    def test_untouched_namespaces_are_written_verbatim(self):
+        LazyModel.objects.create(app_data='{"myapp": {"publish_from": "2012-08-26"}, "other": {"a" :  1}}')
+        inst = LazyModel.objects.get()
+        inst.app_data.myapp.publish_from = date(2012, 8, 27)
+        inst.save()
+
+        raw = LazyModel.objects.values_list("app_data", flat=True).get()
+        self.assertEqual('{"myapp": {"publish_from": "2012-08-27"}, "other": {"a" :  1}}', raw)
+
+    def test_lazy_factory_compares_decoded_data(self):
+        inst = LazyModel(app_data='{"myapp": {"publish_from": "2012-08-26"}}')
+        self.assertEqual({"myapp": {"publish_from": "2012-08-26"}}, inst.app_data)
+
+    def test_untouched_namespaces_are_decoded_when_handed_out(self):
+        LazyModel.objects.create(app_data='{"myapp": {"publish_from": "2012-08-26"}, "other": {"a" :  1}}')
+        data = {"myapp": {"publish_from": "2012-08-26"}, "other": {"a": 1}}
+
+        self.assertEqual(data, LazyModel.objects.get().app_data.serialize())
+        self.assertEqual(data, dict(LazyModel.objects.get().app_data))
+        self.assertEqual(data, {**LazyModel.objects.get().app_data})
+        self.assertEqual(data, LazyModel.objects.get().app_data.copy())
+        self.assertEqual({"a": 1}, LazyModel.objects.get().app_data.pop("other"))
+        self.assertEqual(("other", {"a": 1}), LazyModel.objects.get().app_data.popitem())
+        self.assertEqual({"a": 1}, LazyModel.objects.get().app_data.setdefault("other", {}))
+
+        inst = LazyModel.objects.get()
+        inst.app_data = inst.app_data.copy()
+        inst.save()
+        self.assertEqual(data, json.loads(LazyModel.objects.values_list("app_data", flat=True).get()))
+
+
+class TestCodecs(AppDataTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = {"b": {"y": [1, 2]}, "a": {"x": "z"}}
+
+    def test_stdlib_json_is_the_default(self):
+        self.assertEqual(
+            '{"b": {"y": [1, 2]}, "a": {"x": "z"}}', AppDataField().get_db_prep_value(self.data, connection)
+        )
+
+    def test_compact_codec(self):
+        field = AppDataField(codec=CompactJSONCodec)
+        self.assertEqual('{"b":{"y":[1,2]},"a":{"x":"z"}}', field.get_db_prep_value(self.data, connection))
+
+    def test_canonical_codec_sorts_keys(self):
+        field = AppDataField(codec="app_data.codecs.CanonicalJSONCodec")
+        self.assertEqual('{"a":{"x":"z"},"b":{"y":[1,2]}}', field.get_db_prep_value(self.data, connection))
+        self.assertEqual(
+            '{"a":{"x":"z"},"b":{"y" : [1,2]}}',
+            CanonicalJSONCodec().dumps_namespaces({"b": RawJSON('{"y" : [1,2]}'), "a": {"x": "z"}}),
+        )
+
+    @override_settings(APP_DATA_CODEC="app_data.codecs.CompactJSONCodec")
+    def test_codec_can_be_set_globally(self):
+        self.assertIsInstance(get_codec(), CompactJSONCodec)
+        self.assertEqual('{"b":{"y":[1,2]},"a":{"x":"z"}}', AppDataField().get_db_prep_value(self.data, connection))
+
+    def test_codec_is_used_for_decoding(self):
+        class UpperCodec(JSONCodec):
+            def loads(self, value):
+                return {"myapp": {"title": value.upper()}}
+
+        art = Article()
+        art.__dict__["app_data"] = "hi"
+        with mock.patch.dict(Article._meta.get_field("app_data").__dict__, codec=UpperCodec()):
+            self.assertEqual({"myapp": {"title": "HI"}}, art.app_data)
+
+    def test_codec_is_resolved_once_per_field(self):
+        field = Article._meta.get_field("app_data")
+        self.assertIs(field.codec, field.codec)
+        with override_settings(APP_DATA_CODEC="app_data.codecs.CompactJSONCodec"):
+            self.assertIsInstance(field.codec, CompactJSONCodec)
+        self.assertIs(type(field.codec), JSONCodec)
+
+
+class TestAppDataJSONField(AppDataTestCase):
+    class MyForm(AppDataForm):
+        publish_from = forms.DateField()
+
+    def setUp(self):
+        super().setUp()
+        app_registry.register("myapp", AppDataContainer.from_form(self.MyForm))
+
+    def test_containers_are_saved_as_json(self):
+        inst = JSONModel()
+        inst.app_data.myapp.publish_from = date(2012, 8, 26)
+        inst.save()
+
+        self.assertEqual(1, JSONModel.objects.filter(app_data__myapp__publish_from="2012-08-26").count())
+        inst = JSONModel.objects.get(pk=inst.pk)
+        self.assertEqual({"myapp": {"publish_from": "2012-08-26"}}, inst.app_data)
+        self.assertEqual(date(2012, 8, 26), inst.app_data.myapp.publish_from)
+
+    def test_empty_instance_can_be_saved(self):
+        inst = JSONModel.objects.create()
+        self.assertEqual({}, JSONModel.objects.get(pk=inst.pk).app_data)
+
+    def test_full_clean_validates_containers(self):
+        inst = JSONModel()
+        inst.app_data.myapp.publish_from = date(2012, 8, 26)
+        inst.full_clean()
+        self.assertEqual({"myapp": {"publish_from": "2012-08-26"}}, inst.app_data)
+
+
+class TestCompressedAppDataField(AppDataTestCase):
+    class MyForm(AppDataForm):
+        publish_from = forms.DateField()
+
+    def setUp(self):
+        super().setUp()
+        app_registry.register("myapp", AppDataContainer.from_form(self.MyForm))
+
+    def _stored(self, inst):
+        return bytes(CompressedModel.objects.values_list("app_data", flat=True).get(pk=inst.pk))
+
+    def test_small_data_are_stored_uncompressed(self):
+        inst = CompressedModel()
+        inst.app_data.myapp.publish_from = date(2012, 8, 26)
+        inst.save()
+
+        self.assertEqual(b'\x11{"myapp": {"publish_from": "2012-08-26"}}', self._stored(inst))
+        inst = CompressedModel.objects.get(pk=inst.pk)
+        self.assertEqual(date(2012, 8, 26), inst.app_data.myapp.publish_from)
+
+    def test_large_data_are_compressed(self):
+        data = {"other": {f"key_{i}": "value" for i in range(100)}}
+        inst = CompressedModel.objects.create(app_data=data)
+
+        stored = self._stored(inst)
+        self.assertEqual(0x12, stored[0])
+        self.assertLess(len(stored), len(json.dumps(data)) / 2)
+        self.assertEqual(data, CompressedModel.objects.get(pk=inst.pk).app_data)
+
+    def test_plain_json_is_read(self):
+        inst = CompressedModel.objects.create()
+        CompressedModel.objects.filter(pk=inst.pk).update(app_data=b'{"myapp": {"publish_from": "2012-08-26"}}')
+        inst = CompressedModel.objects.get(pk=inst.pk)
+        self.assertEqual(date(2012, 8, 26), inst.app_data.myapp.publish_from)
+
+        inst.save()
+        self.assertEqual(0x11, self._stored(inst)[0])
+
+    def test_unknown_format_is_rejected(self):
+        inst = CompressedModel.objects.create()
+        CompressedModel.objects.filter(pk=inst.pk).update(app_data=b"\x23{}")
+        inst = CompressedModel.objects.get(pk=inst.pk)
+        self.assertRaises(ValueError, getattr, inst, "app_data")
+
+    def test_changes_are_tracked(self):
+        inst = CompressedModel.objects.create(app_data={"myapp": {"publish_from": "2012-08-26"}})
+        inst = CompressedModel.objects.get(pk=inst.pk)
+        self.assertFalse(inst.app_data.has_changed())
+        inst.app_data.myapp.publish_from = date(2012, 9, 1)
+        self.assertTrue(inst.app_data.has_changed())
+
+    def test_fixtures(self):
+        inst = CompressedModel.objects.create(app_data={"myapp": {"publish_from": "2012-08-26"}})
+        for format, serializer in (("json", None), ("json", json_serializer.Serializer), ("xml", None)):
+            data = serializer().serialize([inst]) if serializer else serializers.serialize(format, [inst])
+            (obj,) = serializers.deserialize(format, data)
+            obj.object.pk = None
+            obj.save()
+            self.assertEqual({"myapp": {"publish_from": "2012-08-26"}}, CompressedModel.objects.latest("pk").app_data)
+
+    def test_partial_updates_are_not_supported(self):
+        self.assertRaises(ValueError, CompressedAppDataField, partial_updates=True)
+
+
+class TestDeconstruct(AppDataTestCase):
+    def test_default_options_are_left_out(self):
+        _name, path, _args, kwargs = AppDataField().deconstruct()
+        self.assertEqual(("app_data.fields.AppDataField", {"default": "{}", "editable": False}), (path, kwargs))
+
+    def test_options_are_kept(self):
+        fields = [
+            (AppDataField(codec=CompactJSONCodec), {"codec": CompactJSONCodec}),
+            (AppDataField(lazy=True), {"lazy": True}),
+            (AppDataJSONField(partial_updates=True), {"partial_updates": True}),
+            (
+                CompressedAppDataField(compress_threshold=100, compress_level=9),
+                {"compress_threshold": 100, "compress_level": 9},
+            ),
+        ]
+        for field, options in fields:
+            _name, _path, args, kwargs = field.deconstruct()
+            self.assertEqual(options, {k: v for k, v in kwargs.items() if k in options})
+            clone = type(field)(*args, **kwargs)
+            self.assertEqual(field.deconstruct(), clone.deconstruct())
+
+
+class TestChangeTracking(AppDataTestCase):
+    class MyForm(AppDataForm):
+        title = forms.CharField(max_length=100, required=False)
+        publish_from = forms.DateField(required=False)
+
+    def setUp(self):
+        super().setUp()
+        app_registry.register("myapp", AppDataContainer.from_form(self.MyForm))
+        self.publishable = Publishable.objects.create()
+        author = Author(publishable=self.publishable)
+        author.app_data.myapp.title = "Title"
+        author.app_data["plain"] = {"key": "value"}
+        author.save()
+        self.author = Author.objects.get(pk=author.pk)
+
+    def _update_sql(self, inst):
+        with CaptureQueriesContext(connection) as queries:
+            inst.save()
+        return [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+
+    def test_new_instance_has_changed(self):
+        self.assertTrue(Author(publishable=self.publishable).app_data.has_changed())
+
+    def test_loaded_data_are_unchanged(self):
+        self.assertFalse(self.author.app_data.has_changed())
+        self.assertEqual("Title", self.author.app_data.myapp.title)
+        self.assertIsNone(self.author.app_data.myapp.publish_from)
+        self.assertFalse(self.author.app_data.has_changed())
+
+    def test_modified_container_is_changed(self):
+        self.author.app_data.myapp.publish_from = date(2012, 8, 26)
+        self.assertTrue(self.author.app_data.has_changed())
+
+    def test_setting_the_same_value_is_unchanged(self):
+        self.author.app_data.myapp.title = "Title"
+        self.assertFalse(self.author.app_data.has_changed())
+
+    def test_plain_data_modified_in_place_is_changed(self):
+        self.author.app_data["plain"]["key"] = "other"
+        self.assertTrue(self.author.app_data.has_changed())
+
+    def test_removed_namespace_is_changed(self):
+        del self.author.app_data["plain"]
+        self.assertTrue(self.author.app_data.has_changed())
+
+    def test_lazy_field_tracks_changes(self):
+        inst = LazyModel()
+        inst.app_data.myapp.title = "Title"
+        inst.save()
+        inst = LazyModel.objects.get(pk=inst.pk)
+        self.assertFalse(inst.app_data.has_changed())
+        inst.app_data.myapp.title = "Other"
+        self.assertTrue(inst.app_data.has_changed())
+
+    def test_json_field_tracks_changes(self):
+        inst = JSONModel()
+        inst.app_data.myapp.title = "Title"
+        inst.save()
+        inst = JSONModel.objects.get(pk=inst.pk)
+        self.assertFalse(inst.app_data.has_changed())
+        inst.app_data.myapp.title = "Other"
+        self.assertTrue(inst.app_data.has_changed())
+
+    def test_unchanged_app_data_is_not_saved(self):
+        self.assertEqual(["publishable_id"], get_update_fields(self.author))
+        self.assertEqual("Title", self.author.app_data.myapp.title)
+        (sql,) = self._update_sql(self.author)
+        self.assertNotIn('"app_data"', sql)
+
+    def test_unread_compressed_app_data_is_not_saved(self):
+        inst = CompressedModel.objects.create(app_data={"myapp": {"text": "x" * 200}})
+        inst = CompressedModel.objects.get(pk=inst.pk)
+        self.assertEqual([], get_update_fields(inst))
+        self.assertEqual("", inst.app_data.myapp.title)
+        self.assertEqual([], get_update_fields(inst))
+        inst.app_data.myapp.title = "Other"
+        self.assertIsNone(get_update_fields(inst))
+
+    def test_changed_app_data_is_saved(self):
+        self.author.app_data.myapp.title = "Other"
+        self.assertIsNone(get_update_fields(self.author))
+        (sql,) = self._update_sql(self.author)
+        self.assertIn('"app_data"', sql)
+        self.assertEqual("Other", Author.objects.get(pk=self.author.pk).app_data.myapp.title)
+
+    def test_saved_data_become_the_baseline(self):
+        self.author.app_data.myapp.title = "Other"
+        self.author.save()
+        self.assertFalse(self.author.app_data.has_changed())
+        (sql,) = self._update_sql(self.author)
+        self.assertNotIn('"app_data"', sql)
+
+
+class TestPartialUpdates(AppDataTestCase):
+    class MyForm(AppDataForm):
+        title = forms.CharField(max_length=100, required=False)
+        publish_from = forms.DateField(required=False)
+
+    def setUp(self):
+        super().setUp()
+        app_registry.register("myapp", AppDataContainer.from_form(self.MyForm))
+
+    def _create(self, model):
+        inst = model()
+        inst.app_data.myapp.title = "Title"
+        inst.app_data["other"] = {"key": "value"}
+        inst.save()
+        return model.objects.get(pk=inst.pk)
+
+    def _update_sql(self, inst):
+        with CaptureQueriesContext(connection) as queries:
+            inst.save()
+        return [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+
+    def _test_partial_update(self, model):
+        inst = self._create(model)
+        # changed behind our back, must survive the partial update
+        stored = model.objects.get(pk=inst.pk)
+        stored.app_data["other"] = {"key": "changed"}
+        stored.save()
+
+        inst.app_data.myapp.publish_from = date(2012, 8, 26)
+        (sql,) = self._update_sql(inst)
+        self.assertIn("JSON_SET", sql.upper())
+        self.assertNotIn("other", sql)
+
+        inst = model.objects.get(pk=inst.pk)
+        self.assertEqual(
+            {"myapp": {"title": "Title", "publish_from": "2012-08-26"}, "other": {"key": "changed"}}, inst.app_data
+        )
+        self.assertEqual(date(2012, 8, 26), inst.app_data.myapp.publish_from)
+
+    def test_text_field_is_patched(self):
+        self._test_partial_update(PartialModel)
+
+    def test_json_field_is_patched(self):
+        self._test_partial_update(PartialJSONModel)
+
+    def test_removed_namespace_is_deleted(self):
+        inst = self._create(PartialModel)
+        del inst.app_data["other"]
+        inst.save()
+        self.assertEqual({"myapp": {"title": "Title"}}, PartialModel.objects.get(pk=inst.pk).app_data)
+
+    def test_saved_data_are_the_new_baseline(self):
+        inst = self._create(PartialModel)
+        inst.app_data.myapp.title = "Other"
+        inst.save()
+        self.assertFalse(inst.app_data.has_changed())
+        inst.app_data.myapp.title = "Title"
+        inst.save()
+        self.assertEqual("Title", PartialModel.objects.get(pk=inst.pk).app_data.myapp.title)
+
+    def test_unconfirmed_write_falls_back_to_whole_value(self):
+        inst = self._create(PartialModel)
+        inst.app_data.myapp.title = "Other"
+        # saved without AppDataModelMixin.save, the stored data are no longer known
+        models.Model.save(inst)
+        inst.app_data.myapp.title = "Title"
+        (sql,) = self._update_sql(inst)
+        self.assertNotIn("JSON_SET", sql.upper())
+        self.assertEqual("Title", PartialModel.objects.get(pk=inst.pk).app_data.myapp.title)
+
+    def test_new_instances_are_inserted_whole(self):
+        inst = self._create(PartialModel)
+        self.assertEqual({"myapp": {"title": "Title"}, "other": {"key": "value"}}, inst.app_data)
+
+
+class TestFieldCodecs(AppDataTestCase):
+    class MyForm(AppDataForm):
+        publish_from = forms.DateField(required=False)
+        published = forms.BooleanField(required=False)
+
+    def test_codecs_are_compiled_once_per_class(self):
+        MyAppContainer = AppDataContainer.from_form(self.MyForm)
+        codecs = MyAppContainer.get_field_codecs()
+        self.assertEqual({"publish_from", "published"}, set(codecs))
+        self.assertIs(codecs, MyAppContainer.get_field_codecs())
+        self.assertIsNot(codecs, AppDataContainer.from_form(self.MyForm).get_field_codecs())
+
+    def test_reads_and_writes_dont_build_forms(self):
+        inst = AppDataContainer.from_form(self.MyForm)({}, {"publish_from": "2012-08-26"})
+        self.assertEqual(date(2012, 8, 26), inst.publish_from)
+        inst.published = True
+        self.assertEqual({"publish_from": "2012-08-26", "published": True}, inst.serialize())
+        self.assertFalse(hasattr(inst, "_form_instance"))
+
+    def test_form_customizing_fields_is_used(self):
+        class CustomForm(self.MyForm):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.fields["publish_from"].input_formats = ["%d.%m.%Y"]
+
+        MyAppContainer = AppDataContainer.from_form(CustomForm)
+        self.assertIsNone(MyAppContainer.get_field_codecs())
+        inst = MyAppContainer({}, {"publish_from": "26.08.2012"})
+        self.assertEqual(date(2012, 8, 26), inst.publish_from)
+
+
+class TestCleanCache(AppDataTestCase):
+    class MyForm(AppDataForm):
+        publish_from = forms.DateField(required=False)
+        tags = forms.MultipleChoiceField(choices=[("a", "a"), ("b", "b")], required=False)
+
+    def _container_class(self, size):
+        class MyAppContainer(AppDataContainer):
+            form_class = self.MyForm
+            clean_cache_size = size
+
+        return MyAppContainer
+
+    def test_cache_is_disabled_by_default(self):
+        codec = AppDataContainer.from_form(self.MyForm).get_field_codecs()["publish_from"]
+        self.assertEqual(codec.field.clean, codec.clean)
+
+    def test_cleaned_values_are_shared(self):
+        MyAppContainer = self._container_class(10)
+        codec = MyAppContainer.get_field_codecs()["publish_from"]
+        with mock.patch.object(codec.field, "clean", wraps=codec.field.clean) as clean:
+            for _ in range(3):
+                self.assertEqual(date(2012, 8, 26), MyAppContainer({}, {"publish_from": "2012-08-26"}).publish_from)
+                self.assertIsNone(MyAppContainer({}).publish_from)
+        self.assertEqual(2, clean.call_count)
+
+    def test_cache_is_bounded(self):
+        codec = self._container_class(2).get_field_codecs()["publish_from"]
+        for day in (1, 2, 3):
+            codec.clean(f"2012-08-0{day}")
+        self.assertEqual([(str, "2012-08-02"), (str, "2012-08-03")], [key[:2] for key in codec._cache])
+
+    @override_settings(USE_TZ=True, TIME_ZONE="UTC")
+    def test_cleaned_values_depend_on_active_timezone(self):
+        class MyForm(AppDataForm):
+            published = forms.DateTimeField(required=False)
+
+        class MyAppContainer(AppDataContainer):
+            form_class = MyForm
+            clean_cache_size = 10
+
+        data = {"published": "2012-08-26 12:00:00"}
+        with timezone.override("Europe/Prague"):
+            self.assertEqual(datetime.fromisoformat("2012-08-26 10:00+00:00"), MyAppContainer({}, data).published)
+        with timezone.override("America/New_York"):
+            self.assertEqual(datetime.fromisoformat("2012-08-26 16:00+00:00"), MyAppContainer({}, data).published)
+
+    def test_mutable_results_are_copied(self):
+        MyAppContainer = self._container_class(10)
+        first = MyAppContainer({})
+        first.tags.append("a")
+        self.assertEqual([], MyAppContainer({}).tags)
+        self.assertIsNot(MyAppContainer({}, {"tags": ("a",)}).tags, MyAppContainer({}, {"tags": ("a",)}).tags)
+
+    def test_validation_errors_are_not_cached(self):
+        codec = self._container_class(10).get_field_codecs()["publish_from"]
+        self.assertRaises(ValidationError, codec.clean, "invalid")
+        self.assertEqual({}, codec._cache)
+
+
+class TestCompactContainers(AppDataTestCase):
+    def _allocated_per_instance(self, factory, count=1000):
+        tracemalloc.start()
+        try:
+            instances = [factory() for _ in range(count)]  # noqa: F841
+            allocated, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return allocated / count
+
+    def test_containers_have_no_instance_dict(self):
+        inst = Article()
+        self.assertFalse(hasattr(inst.app_data, "__dict__"))
+        self.assertFalse(hasattr(AppDataContainer.from_form(AppDataForm)(inst), "__dict__"))
+
+    def test_slotted_container_is_smaller(self):
+        class DictContainer(AppDataContainer):
+            pass
+
+        SlottedContainer = AppDataContainer.from_form(AppDataForm)
+        inst = Article()
+        self.assertLess(
+            self._allocated_per_instance(lambda: SlottedContainer(inst)),
+            self._allocated_per_instance(lambda: DictContainer(inst)),
+        )
@@ -1,15 +1,23 @@
 from datetime import date
+from unittest import mock
 
 from django import forms
+from django.db.models.signals import post_init
 from django.forms.models import ModelChoiceField, modelform_factory
 
 from app_data.containers import AppDataContainer, AppDataForm
 from app_data.fields import ListModelMultipleChoiceField
-from app_data.forms import MultiForm, multiform_factory, multiformset_factory
+from app_data.forms import (
+    AppDataBaseInlineFormSet,
+    MultiForm,
+    multiform_factory,
+    multiformset_factory,
+    multiinlineformset_factory,
+)
 from app_data.registry import app_registry
 
 from .cases import AppDataTestCase
-from .models import Article, Category
+from .models import Article, Author, Category, Publishable
 
 
 class TestMultiForm(AppDataTestCase):
@@ -153,6 +161,54 @@ class TestMultiForm(AppDataTestCase):
         art = form.save()
         self.assertEqual({}, art.app_data)
 
+    def test_app_form_opts_are_merged_once(self):
+        MF = multiform_factory(Article, form_opts={"myapp": {}}, exclude=())
+        self.assertEqual({"myapp": {}}, MF.get_app_form_opts())
+        with mock.patch.object(MF, "_combine_app_form_opts") as combine:
+            MF({})
+            MF.get_app_form_opts()
+        combine.assert_not_called()
+
+    def test_app_form_opts_cache_is_invalidated_by_base_class_changes(self):
+        class Base(MultiForm):
+            pass
+
+        MF = multiform_factory(Article, multiform=Base, form_opts={"myapp": {}}, exclude=())
+        self.assertEqual({"myapp": {}}, MF.get_app_form_opts())
+        Base.add_form("myapp2", {"fields": ["foo"]})
+        self.assertEqual({"myapp": {}, "myapp2": {"fields": ["foo"]}}, MF.get_app_form_opts())
+        Base.remove_form("myapp")
+        self.assertEqual({"myapp": {}, "myapp2": {"fields": ["foo"]}}, MF.get_app_form_opts())
+        MF.remove_form("myapp2")
+        self.assertEqual({"myapp": {}}, MF.get_app_form_opts())
+
+    def test_base_fields_dont_instantiate_the_model(self):
+        MF = multiform_factory(Article, form_opts={"myapp": {"fields": ["title"]}}, exclude=())
+        with mock.patch.object(post_init, "send") as send:
+            base_fields = MF.base_fields
+        send.assert_not_called()
+        self.assertIn("myapp.title", base_fields)
+        self.assertNotIn("myapp.publish_from", base_fields)
+
+    def test_base_fields_are_cached_per_class(self):
+        MF = multiform_factory(Article, form_opts={"myapp": {}}, exclude=())
+        MF2 = multiform_factory(Article, form_opts={"myapp2": {}}, exclude=())
+        self.assertIs(MF.base_fields, MF.base_fields)
+        self.assertIn("myapp.title", MF.base_fields)
+        self.assertNotIn("myapp.title", MF2.base_fields)
+        self.assertIn("myapp2.foo", MF2.base_fields)
+
+    def test_base_fields_cache_is_invalidated(self):
+        MF = multiform_factory(Article, form_opts={"myapp": {}}, exclude=())
+        self.assertNotIn("myapp2.foo", MF.base_fields)
+        MF.add_form("myapp2")
+        self.assertIn("myapp2.foo", MF.base_fields)
+
+        app_registry.unregister("myapp2")
+        app_registry.register("myapp2", AppDataContainer.from_form(self.MyForm))
+        self.assertNotIn("myapp2.foo", MF.base_fields)
+        self.assertIn("myapp2.title", MF.base_fields)
+
 
 class TestAppDataForms(AppDataTestCase):
     class MyForm(AppDataForm):
@@ -238,3 +294,47 @@ class TestAppDataForms(AppDataTestCase):
         article = Article.objects.get(pk=article.pk)
         self.assertEqual("First!", article.app_data.myapp._data["title"])
         self.assertFalse("publish_from" in article.app_data.myapp._data)
+
+
+class TestInlineFormSetFields(AppDataTestCase):
+    class MyForm(AppDataForm):
+        kind = forms.ChoiceField(choices=[(str(i), f"Choice {i}") for i in range(300)], required=False)
+        category = ModelChoiceField(queryset=Category.objects.all(), required=False)
+        when = forms.SplitDateTimeField(required=False)
+
+    def setUp(self):
+        super().setUp()
+        app_registry.register("myapp", AppDataContainer.from_form(self.MyForm))
+        self.FormSet = multiinlineformset_factory(
+            Publishable, Author, formset=AppDataBaseInlineFormSet, form_opts={"myapp": {}}, exclude=(), extra=3
+        )
+
+    def test_fields_are_labeled_copies(self):
+        formset = self.FormSet(instance=Publishable.objects.create())
+        first, second = formset.forms[:2]
+        self.assertEqual("Kind", first.fields["myapp.kind"].label)
+        self.assertIsNot(first.fields["myapp.kind"], second.fields["myapp.kind"])
+        self.assertIsNot(first.fields["myapp.kind"], self.FormSet.form.base_fields["myapp.kind"])
+
+    def test_choices_are_shared_and_mutable_state_is_not(self):
+        first, second = self.FormSet(instance=Publishable.objects.create()).forms[:2]
+        self.assertIs(first.fields["myapp.kind"].choices, second.fields["myapp.kind"].choices)
+
+        first.fields["myapp.kind"].widget.attrs["class"] = "first"
+        first.fields["myapp.kind"].label = "First"
+        first.fields["myapp.kind"].error_messages["required"] = "!"
+        self.assertEqual({}, second.fields["myapp.kind"].widget.attrs)
+        self.assertEqual("Kind", second.fields["myapp.kind"].label)
+        self.assertNotEqual("!", second.fields["myapp.kind"].error_messages["required"])
+
+    def test_model_choice_fields_get_own_queryset(self):
+        first, second = self.FormSet(instance=Publishable.objects.create()).forms[:2]
+        category = Category.objects.create()
+        first_field, second_field = first.fields["myapp.category"], second.fields["myapp.category"]
+        self.assertIsNot(first_field.queryset, second_field.queryset)
+        self.assertIs(first_field, first_field.widget.choices.field)
+        self.assertEqual([category.pk], [c.pk for c in first_field.queryset])
+
+    def test_other_fields_are_deep_copied(self):
+        first, second = self.FormSet(instance=Publishable.objects.create()).forms[:2]
+        self.assertIsNot(first.fields["myapp.when"].widget.widgets[0], second.fields["myapp.when"].widget.widgets[0])
@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django import forms
+
+from app_data import instrumentation
+from app_data.containers import AppDataContainer, AppDataForm
+from app_data.registry import app_registry
+
+from .cases import AppDataTestCase
+from .models import Article, LazyModel
+
+
+class TestInstrumentation(AppDataTestCase):
+    class MyForm(AppDataForm):
+        title = forms.CharField(max_length=100, required=False)
+        noindex = forms.BooleanField(required=False)
+
+    def setUp(self):
+        super().setUp()
+        app_registry.register("myapp", AppDataContainer.from_form(self.MyForm))
+        inst = Article()
+        inst.app_data.myapp.title = "Title"
+        inst.save()
+        self.pk = inst.pk
+
+    def tearDown(self):
+        super().tearDown()
+        instrumentation.disable()
+
+    def _operations(self, stats):
+        return {
+            (o["model"], o["namespace"], o["operation"]): (o["count"], o["bytes"])
+            for o in stats.as_dict()["operations"]
+        }
+
+    def test_nothing_is_recorded_by_default(self):
+        self.assertEqual(0, instrumentation.active)
+        self.assertIsNone(instrumentation.get_stats())
+
+    def test_hot_paths_are_recorded(self):
+        with instrumentation.collect() as stats:
+            inst = Article.objects.get(pk=self.pk)
+            self.assertEqual("Title", inst.app_data.myapp.title)
+            self.assertEqual("Title", inst.app_data.myapp.title)
+            inst.app_data.myapp.noindex = True
+            inst.app_data.validate(inst)
+            inst.save()
+
+        stored = '{"myapp": {"title": "Title"}}'
+        operations = self._operations(stats)
+        self.assertEqual((1, len(stored)), operations["test_app_data.Article", None, "decode"])
+        self.assertEqual((1, 0), operations["test_app_data.Article", "myapp", "clean"])
+        self.assertEqual((1, 0), operations["test_app_data.Article", "myapp", "validate"])
+        self.assertEqual(1, operations["test_app_data.Article", "myapp", "serialize"][0])
+        self.assertEqual(1, operations["test_app_data.Article", None, "encode"][0])
+        self.assertEqual(
+            [{"model": "test_app_data.Article", "namespace": "myapp", "field": "title", "count": 2}],
+            stats.as_dict()["fields_read"],
+        )
+        self.assertEqual(0, instrumentation.active)
+
+    def test_lazy_namespaces_decoding_is_recorded(self):
+        inst = LazyModel()
+        inst.app_data.myapp.title = "Title"
+        inst.app_data["other"] = {}
+        inst.save()
+        with instrumentation.collect() as stats:
+            self.assertEqual({"title": "Title"}, LazyModel.objects.get(pk=inst.pk).app_data.myapp)
+
+        operations = self._operations(stats)
+        self.assertEqual((1, len('{"title": "Title"}')), operations["test_app_data.LazyModel", "myapp", "decode"])
+        self.assertNotIn(("test_app_data.LazyModel", "other", "decode"), operations)
+
+    def test_collection_is_scoped_to_context(self):
+        # loaded here, the test's transaction keeps the database locked for other threads
+        inst = Article.objects.get(pk=self.pk)
+
+        def work():
+            # instrumented, other threads aren't collected though
+            self.assertTrue(instrumentation.active)
+            return inst.app_data.myapp.title
+
+        with instrumentation.collect() as stats, ThreadPoolExecutor(1) as executor:
+            # re-raises exceptions of the thread
+            title = executor.submit(work).result()
+        self.assertEqual("Title", title)
+        self.assertEqual({"operations": [], "fields_read": []}, stats.as_dict())
+
+    def test_global_stats(self):
+        instrumentation.enable()
+        self.assertEqual("Title", Article.objects.get(pk=self.pk).app_data.myapp.title)
+        stats = instrumentation.get_stats()
+        self.assertIn(("test_app_data.Article", "myapp", "clean"), self._operations(stats))
+        stats.reset()
+        self.assertEqual({"operations": [], "fields_read": []}, stats.as_dict())
+        instrumentation.disable()
+        self.assertIsNone(instrumentation.get_stats())
+        self.assertEqual(0, instrumentation.active)
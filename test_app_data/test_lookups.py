@@ -0,0 +1,65 @@
+from datetime import date
+
+from django import forms
+
+from app_data.containers import AppDataContainer, AppDataForm
+from app_data.registry import app_registry
+
+from .cases import AppDataTestCase
+from .models import Article, JSONModel
+
+
+class TestLookups(AppDataTestCase):
+    class MyForm(AppDataForm):
+        title = forms.CharField(max_length=100, required=False)
+        noindex = forms.BooleanField(required=False)
+        publish_from = forms.DateField(required=False)
+
+    def setUp(self):
+        super().setUp()
+        app_registry.register("myapp", AppDataContainer.from_form(self.MyForm))
+
+        self.first = self._create(Article, title="First", noindex=True, publish_from=date(2012, 8, 26))
+        self.second = self._create(Article, title="Second", noindex=False, publish_from=date(2012, 9, 1))
+        self.third = Article.objects.create(app_data={"other": {"title": "Third"}})
+
+    def _create(self, model, **data):
+        inst = model()
+        inst.app_data.myapp.update(data)
+        inst.save()
+        return inst
+
+    def test_filter_by_key(self):
+        self.assertEqual([self.first], list(Article.objects.filter(app_data__myapp__noindex=True)))
+        self.assertEqual([self.second], list(Article.objects.filter(app_data__myapp__title="Second")))
+
+    def test_filter_uses_form_field_types(self):
+        self.assertEqual([self.first], list(Article.objects.filter(app_data__myapp__publish_from=date(2012, 8, 26))))
+        self.assertEqual(
+            [self.second],
+            list(Article.objects.filter(app_data__myapp__publish_from__gt=date(2012, 8, 26))),
+        )
+        self.assertEqual(
+            [self.first, self.second],
+            list(
+                Article.objects.filter(
+                    app_data__myapp__publish_from__in=[date(2012, 8, 26), date(2012, 9, 1)]
+                ).order_by("pk")
+            ),
+        )
+
+    def test_filter_unregistered_namespace(self):
+        self.assertEqual([self.third], list(Article.objects.filter(app_data__other__title="Third")))
+
+    def test_has_namespace(self):
+        self.assertEqual([self.third], list(Article.objects.filter(app_data__has_namespace="other")))
+        self.assertEqual(2, Article.objects.filter(app_data__has_namespace="myapp").count())
+
+    def test_has_key(self):
+        self.assertEqual([self.third], list(Article.objects.filter(app_data__other__has_key="title")))
+        self.assertEqual(0, Article.objects.filter(app_data__myapp__has_key="missing").count())
+
+    def test_json_field_lookups(self):
+        inst = self._create(JSONModel, noindex=True, publish_from=date(2012, 8, 26))
+        self.assertEqual([inst], list(JSONModel.objects.filter(app_data__myapp__publish_from=date(2012, 8, 26))))
+        self.assertEqual([inst], list(JSONModel.objects.filter(app_data__has_namespace="myapp")))
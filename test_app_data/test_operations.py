@@ -0,0 +1,129 @@
+from unittest import mock
+
+from django.apps import apps
+from django.db import connection
+from django.db.migrations.state import ProjectState
+
+from app_data.operations import MoveAppDataKey, RemoveAppDataNamespace, RenameAppDataNamespace
+
+from .cases import AppDataTestCase
+from .models import Article, CompressedModel, JSONModel
+
+
+class TestOperations(AppDataTestCase):
+    def setUp(self):
+        super().setUp()
+        self.state = ProjectState.from_apps(apps)
+        self.first = Article.objects.create(
+            app_data={"legacy": {"title": "First", "noindex": True, "tags": [1, 2]}, "other": {"x": 1}}
+        )
+        self.second = Article.objects.create(app_data={"other": {"x": 2}})
+
+    def _forwards(self, operation, schema_editor=None):
+        operation.database_forwards("test_app_data", schema_editor or connection.schema_editor(), None, self.state)
+
+    def _backwards(self, operation):
+        operation.database_backwards("test_app_data", connection.schema_editor(), self.state, self.state)
+
+    def _data(self, obj):
+        return type(obj).objects.get(pk=obj.pk).app_data
+
+    def test_rename_namespace(self):
+        operation = RenameAppDataNamespace("Article", "legacy", "seo")
+        self._forwards(operation)
+        self.assertEqual(
+            {"seo": {"title": "First", "noindex": True, "tags": [1, 2]}, "other": {"x": 1}}, self._data(self.first)
+        )
+        self.assertEqual({"other": {"x": 2}}, self._data(self.second))
+
+        self._backwards(operation)
+        self.assertEqual(
+            {"legacy": {"title": "First", "noindex": True, "tags": [1, 2]}, "other": {"x": 1}},
+            self._data(self.first),
+        )
+
+    def test_move_key(self):
+        operation = MoveAppDataKey("Article", "noindex", "legacy", "seo")
+        self._forwards(operation)
+        self.assertEqual(
+            {"legacy": {"title": "First", "tags": [1, 2]}, "other": {"x": 1}, "seo": {"noindex": True}},
+            self._data(self.first),
+        )
+        self.assertEqual({"other": {"x": 2}}, self._data(self.second))
+
+        self._backwards(operation)
+        self.assertEqual({"title": "First", "noindex": True, "tags": [1, 2]}, self._data(self.first)["legacy"])
+
+    def test_move_key_to_existing_namespace_and_rename_it(self):
+        self._forwards(MoveAppDataKey("Article", "tags", "legacy", "other", new_key="labels"))
+        self.assertEqual({"x": 1, "labels": [1, 2]}, self._data(self.first)["other"])
+        self.assertEqual({"x": 2}, self._data(self.second)["other"])
+
+    def test_move_key_needs_a_different_target(self):
+        self.assertRaises(ValueError, MoveAppDataKey, "Article", "title", "legacy", "legacy")
+
+    def test_remove_namespace(self):
+        self._forwards(RemoveAppDataNamespace("Article", "legacy"))
+        self.assertEqual({"other": {"x": 1}}, self._data(self.first))
+        self.assertEqual({"other": {"x": 2}}, self._data(self.second))
+
+    def test_json_field(self):
+        inst = JSONModel.objects.create(app_data={"legacy": {"noindex": False}})
+        self._forwards(MoveAppDataKey("JSONModel", "noindex", "legacy", "seo"))
+        self.assertEqual({"legacy": {}, "seo": {"noindex": False}}, self._data(inst))
+
+    def test_compressed_field(self):
+        # compressed and plain values
+        large = CompressedModel.objects.create(app_data={"legacy": {"title": "x" * 200, "noindex": True}})
+        small = CompressedModel.objects.create(app_data={"legacy": {"title": "small"}})
+        self._forwards(RenameAppDataNamespace("CompressedModel", "legacy", "seo"))
+        self._forwards(MoveAppDataKey("CompressedModel", "noindex", "seo", "flags"))
+        self.assertEqual({"seo": {"title": "x" * 200}, "flags": {"noindex": True}}, self._data(large))
+        self.assertEqual({"seo": {"title": "small"}}, self._data(small))
+
+        self._forwards(RemoveAppDataNamespace("CompressedModel", "flags"))
+        self.assertEqual({"seo": {"title": "x" * 200}}, self._data(large))
+
+    def test_compressed_field_sql_is_not_collected(self):
+        schema_editor = connection.schema_editor(collect_sql=True)
+        self._forwards(RemoveAppDataNamespace("CompressedModel", "legacy"), schema_editor)
+        self.assertEqual(
+            ["-- THIS OPERATION IS DONE IN PYTHON FOR THIS FIELD AND DATABASE"], schema_editor.collected_sql
+        )
+
+    def test_single_update_statement(self):
+        with self.assertNumQueries(1):
+            self._forwards(RenameAppDataNamespace("Article", "legacy", "seo"))
+
+    def test_sql_is_collected(self):
+        schema_editor = connection.schema_editor(collect_sql=True)
+        self._forwards(RemoveAppDataNamespace("Article", "legacy"), schema_editor)
+        self.assertEqual(1, len(schema_editor.collected_sql))
+        self.assertIn("UPDATE", schema_editor.collected_sql[0])
+        self.assertIn("legacy", self._data(self.first))
+
+    def test_python_fallback(self):
+        Article.objects.create(app_data={"legacy": {"title": "Third"}})
+        operations = [
+            RenameAppDataNamespace("Article", "legacy", "seo", chunk_size=1),
+            MoveAppDataKey("Article", "x", "other", "seo", chunk_size=1),
+            RemoveAppDataNamespace("Article", "other", chunk_size=1),
+        ]
+        with mock.patch("app_data.operations.supports_json_edits", return_value=False):
+            for operation in operations:
+                self._forwards(operation)
+        self.assertEqual({"seo": {"title": "First", "noindex": True, "tags": [1, 2], "x": 1}}, self._data(self.first))
+        self.assertEqual({"seo": {"x": 2}}, self._data(self.second))
+        self.assertEqual(
+            [{"seo": {"title": "Third"}}], [a.app_data for a in Article.objects.filter(pk__gt=self.second.pk)]
+        )
+
+    def test_deconstruct(self):
+        self.assertEqual(
+            ("MoveAppDataKey", ["Article", "noindex", "legacy", "seo"], {"new_key": "hidden", "field_name": "data"}),
+            MoveAppDataKey("Article", "noindex", "legacy", "seo", new_key="hidden", field_name="data").deconstruct(),
+        )
+        self.assertEqual(
+            ("RenameAppDataNamespace", ["Article", "legacy", "seo"], {}),
+            RenameAppDataNamespace("Article", "legacy", "seo").deconstruct(),
+        )
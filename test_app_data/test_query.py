@@ -0,0 +1,160 @@
+from datetime import date
+from unittest import skipUnless
+
+from django import forms
+from django.core.exceptions import FieldError
+from django.db.models import QuerySet
+
+from app_data.containers import AppDataContainer, AppDataForm
+from app_data.fields import ListModelMultipleChoiceField
+from app_data.query import prefetch_app_data
+from app_data.registry import app_registry
+
+from .cases import AppDataTestCase
+from .models import Article, Category
+
+
+class TestPrefetchAppData(AppDataTestCase):
+    def setUp(self):
+        super().setUp()
+
+        class RelatedForm(AppDataForm):
+            category = forms.ModelChoiceField(Category.objects.all(), required=False)
+            categories = ListModelMultipleChoiceField(Category.objects.all(), required=False)
+            category_set = forms.ModelMultipleChoiceField(Category.objects.all(), required=False)
+            title = forms.CharField(required=False)
+
+        app_registry.register("related", AppDataContainer.from_form(RelatedForm))
+        self.categories = [Category.objects.create() for _ in range(3)]
+        for i in range(3):
+            article = Article()
+            article.app_data.related.category = self.categories[i]
+            article.app_data.related.categories = self.categories[: i + 1]
+            article.app_data.related.category_set = self.categories[i:]
+            article.save()
+        Article.objects.create()
+
+    def test_model_choices_are_fetched_in_one_query(self):
+        articles = list(Article.objects.order_by("pk").prefetch_app_data("related.category"))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.categories + [None], [a.app_data.related.category for a in articles])
+
+    def test_list_model_multiple_choices_are_fetched_in_one_query(self):
+        with self.assertNumQueries(2):
+            articles = list(Article.objects.order_by("pk").prefetch_app_data("related.categories"))
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [self.categories[:1], self.categories[:2], self.categories, []],
+                [a.app_data.related.categories for a in articles],
+            )
+
+    def test_model_multiple_choices_are_fetched_in_one_query(self):
+        with self.assertNumQueries(2):
+            articles = list(Article.objects.order_by("pk").prefetch_app_data("related.category_set"))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.categories, list(articles[0].app_data.related.category_set))
+            self.assertEqual(self.categories[2:], list(articles[2].app_data.related.category_set))
+
+    def test_prefetched_data_are_unchanged(self):
+        (article,) = Article.objects.filter(pk=Article.objects.order_by("pk")[0].pk).prefetch_app_data(
+            "related.category", "related.categories"
+        )
+        self.assertFalse(article.app_data.has_changed())
+        self.assertEqual(
+            {"category": self.categories[0].pk, "categories": [self.categories[0].pk]},
+            {k: v for k, v in article.app_data["related"].serialize().items() if k != "category_set"},
+        )
+
+    def test_invalid_choices_are_left_to_the_form_field(self):
+        article = Article.objects.create(app_data={"related": {"category": 0}})
+        prefetch_app_data([article], "related.category")
+        self.assertRaises(forms.ValidationError, lambda: article.app_data.related.category)
+
+    def test_iterator_prefetches_each_chunk(self):
+        queryset = Article.objects.order_by("pk").prefetch_app_data("related.category")
+        # one query for the articles and one per chunk of two
+        with self.assertNumQueries(3):
+            articles = list(queryset.iterator(chunk_size=2))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.categories + [None], [a.app_data.related.category for a in articles])
+
+    @skipUnless(hasattr(QuerySet, "aiterator"), "async ORM needs Django 4.1")
+    async def test_aiterator_prefetches_each_chunk(self):
+        queryset = Article.objects.order_by("pk").prefetch_app_data("related.category")
+        articles = [article async for article in queryset.aiterator(chunk_size=2)]
+        # no queries are run from the event loop any more
+        self.assertEqual(self.categories + [None], [a.app_data.related.category for a in articles])
+
+    def test_prefetch_function(self):
+        articles = list(Article.objects.order_by("pk"))
+        with self.assertNumQueries(1):
+            prefetch_app_data(articles, "related.category")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.categories[1], articles[1].app_data.related.category)
+
+    def test_prefetch_can_be_cleared(self):
+        articles = list(Article.objects.prefetch_app_data("related.category").prefetch_app_data(None))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.categories[0], articles[0].app_data.related.category)
+
+    def test_only_model_choice_fields_can_be_prefetched(self):
+        self.assertRaises(FieldError, list, Article.objects.prefetch_app_data("related.title"))
+        self.assertRaises(FieldError, list, Article.objects.prefetch_app_data("unknown.category"))
+        self.assertRaises(FieldError, list, Article.objects.prefetch_app_data("related"))
+
+
+class TestValuesAppData(AppDataTestCase):
+    class MyForm(AppDataForm):
+        title = forms.CharField(max_length=100, required=False)
+        noindex = forms.BooleanField(required=False)
+        publish_from = forms.DateField(required=False)
+
+    def setUp(self):
+        super().setUp()
+        app_registry.register("myapp", AppDataContainer.from_form(self.MyForm))
+        self.first = Article.objects.create(
+            app_data={"myapp": {"title": "First", "noindex": True, "publish_from": "2012-08-26"}}
+        )
+        self.second = Article.objects.create(app_data={"other": {"title": "Second", "nested": {"count": 2}}})
+
+    def test_values_are_returned_as_tuples(self):
+        self.assertEqual(
+            [("First", True, None), (None, None, "Second")],
+            list(Article.objects.order_by("pk").values_app_data("myapp.title", "myapp.noindex", "other.title")),
+        )
+
+    def test_values_can_be_returned_as_dicts(self):
+        self.assertEqual(
+            [{"myapp.title": "First", "other.nested.count": None}, {"myapp.title": None, "other.nested.count": 2}],
+            list(Article.objects.order_by("pk").values_app_data("myapp.title", "other.nested.count", as_dict=True)),
+        )
+
+    def test_flat_values(self):
+        self.assertEqual(
+            ["First"], list(Article.objects.filter(pk=self.first.pk).values_app_data("myapp.title", flat=True))
+        )
+        self.assertRaises(TypeError, Article.objects.values_app_data, "myapp.title", "other.title", flat=True)
+
+    def test_values_can_be_converted_by_form_fields(self):
+        self.assertEqual(
+            [(date(2012, 8, 26), "First")],
+            list(
+                Article.objects.filter(pk=self.first.pk).values_app_data(
+                    "myapp.publish_from", "myapp.title", to_python=True
+                )
+            ),
+        )
+
+    def test_values_can_be_filtered(self):
+        self.assertEqual(
+            ["Second"],
+            list(Article.objects.filter(app_data__other__nested__count=2).values_app_data("other.title", flat=True)),
+        )
+
+    def test_values_dont_load_app_data(self):
+        with self.assertNumQueries(1):
+            (row,) = Article.objects.filter(pk=self.first.pk).values_app_data("myapp.title")
+        self.assertEqual(("First",), row)
+
+    def test_invalid_paths(self):
+        self.assertRaises(FieldError, Article.objects.values_app_data, "myapp")